@@ -0,0 +1,151 @@
+import argparse
+import json
+import signal
+import sys
+import time
+from functools import partial
+from multiprocessing import Pool
+
+from cache import shared_cache
+from frontier import FRONTIERS
+from nine import SEARCH_CHOICES, UnsolvableError, exact_distance_table, make_problem, parse_board, search
+
+class SearchTimeout(Exception):
+    pass
+
+def raise_timeout(signum, frame):
+    raise SearchTimeout()
+
+#Solving one board line into a JSON-ready record; bad boards, and boards the choice can not handle,
+#get an 'error' instead, unsolvable ones with status 'unsolvable'.
+#Goal, move and heuristic tables are cached per board size in nine.py, so only the first
+#board of each size pays for building them, and that happens before its wall_time starts.
+#With a cache size, solved paths go into this process's transposition cache and boards on them are
+#answered without a search.
+def solve_record(index, line, choice, cache_size=0, frontier='bucket'):
+    record = {'index': index, 'board': line}
+    try:
+        initial_state, size = parse_board(line)
+        record['size'] = size
+        problem = make_problem(initial_state, size, choice, cache=shared_cache(cache_size) if cache_size else None,
+                               frontier=frontier)
+        if problem['method'] == 'table':
+            exact_distance_table()
+        start = time.perf_counter()
+        stats = {}
+        result, nodes_expanded, max_queue_size = search(problem, size, stats)
+    except ValueError as error:
+        if isinstance(error, UnsolvableError):
+            record['status'] = 'unsolvable'
+        record['error'] = str(error)
+        return record
+    record['wall_time'] = round(time.perf_counter() - start, 6)
+    record['nodes_expanded'] = nodes_expanded
+    record['max_queue_size'] = max_queue_size
+    record['status'] = stats['status']
+    if result == "failure":
+        record['error'] = "No solution found."
+    else:
+        record['depth'] = result['cost']
+        record['moves'] = result['moves']
+    return record
+
+#Solving one (index, board) item with a per-board time limit from SIGALRM, so a stuck
+#board only costs its own slot. Runs in a pool worker or in the main process.
+def solve_item(item, choice, timeout=None, cache_size=0, frontier='bucket'):
+    index, line = item
+    if not timeout:
+        return solve_record(index, line, choice, cache_size, frontier)
+    previous = signal.signal(signal.SIGALRM, raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return solve_record(index, line, choice, cache_size, frontier)
+    except SearchTimeout:
+        return {'index': index, 'board': line, 'status': 'budget_exceeded',
+                'error': f"Timed out after {timeout} seconds."}
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+#Workers leave Ctrl-C to the parent, which cancels the whole pool
+def init_worker():
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+#Boards one per line, blank lines and lines starting with # are skipped
+def read_boards(file):
+    for line in file:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
+
+#Building table files in the parent before the first board of each size is handed out, so workers
+#only memory-map them and share the pages instead of each building or pickling its own copy
+def warm_tables(items, choice):
+    warmed = set()
+    for index, line in items:
+        try:
+            initial_state, size = parse_board(line)
+        except ValueError:
+            size = None
+        if size is not None and size not in warmed:
+            warmed.add(size)
+            try:
+                problem = make_problem(initial_state, size, choice)
+                if problem['method'] == 'table' and size == 3:
+                    exact_distance_table()
+            except ValueError:
+                pass
+        yield index, line
+
+#Records in input order, or as they finish when ordered is False
+def solve_all(lines, choice, workers=1, timeout=None, ordered=True, chunksize=4, cache_size=0, frontier='bucket'):
+    items = enumerate(lines)
+    task = partial(solve_item, choice=choice, timeout=timeout, cache_size=cache_size, frontier=frontier)
+    if workers <= 1:
+        yield from map(task, items)
+        return
+    with Pool(workers, initializer=init_worker) as pool:
+        mapper = pool.imap if ordered else pool.imap_unordered
+        yield from mapper(task, warm_tables(items, choice), chunksize)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Solve many boards and write one JSON record per board.")
+    parser.add_argument('input', nargs='?', default='-', help="file with one board per line, - for stdin")
+    parser.add_argument('--choice', type=int, default=3, choices=sorted(SEARCH_CHOICES),
+                        help=", ".join(f"{choice} for {label}" for choice, (label, _, _) in SEARCH_CHOICES.items()))
+    parser.add_argument('--output', default='-', help="JSON Lines file to write, - for stdout")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes, 1 solves in this process")
+    parser.add_argument('--timeout', type=float, help="seconds allowed per board")
+    parser.add_argument('--unordered', action='store_true', help="write records as they finish, not in input order")
+    parser.add_argument('--chunksize', type=int, default=4, help="boards handed to a worker at a time")
+    parser.add_argument('--cache-size', type=int, default=0,
+                        help="states kept in each process's transposition cache, 0 turns it off")
+    parser.add_argument('--frontier', default='bucket', choices=sorted(FRONTIERS),
+                        help="open list of the graph searches: bucket queue or binary heap")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    source = sys.stdin if args.input == '-' else open(args.input)
+    target = sys.stdout if args.output == '-' else open(args.output, 'w')
+    records = solve_all(read_boards(source), args.choice, args.workers, args.timeout,
+                        not args.unordered, args.chunksize, args.cache_size, args.frontier)
+    try:
+        for record in records:
+            target.write(json.dumps(record) + '\n')
+            target.flush()
+        if args.cache_size and args.workers <= 1:
+            print(f"Cache: {json.dumps(shared_cache().stats())}", file=sys.stderr)
+    except KeyboardInterrupt:
+        #leaving the generator terminates the pool, records already written stay valid
+        records.close()
+        print("Cancelled.", file=sys.stderr)
+        sys.exit(130)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+import argparse
+import json
+import platform
+import random
+import resource
+import sys
+import time
+from collections import deque
+from multiprocessing import Pool
+
+from batch import solve_item, warm_tables
+from frontier import FRONTIERS
+from nine import SEARCH_CHOICES, make_goal_state, move_table, tile_bits, unpack_state
+
+#Search choices run on each instance set by default; the others would not finish on the harder sets
+DEFAULT_CHOICES = {
+    'eight': tuple(SEARCH_CHOICES),
+    'korf100': (4, 5, 6),
+    'random5': (4, 6),
+}
+
+def board_text(state, size):
+    return ' '.join(str(tile) for row in unpack_state(state, size) for tile in row)
+
+#One 3x3 board for every optimal depth 0..31: the first state of each BFS layer from the goal
+def eight_instances():
+    size = 3
+    bits = tile_bits(size)
+    mask = (1 << bits) - 1
+    moves = move_table(size)
+    goal_state = make_goal_state(size)
+    depth = {goal_state: 0}
+    firsts = [goal_state]
+    queue = deque([(goal_state, size * size - 1)])
+    while queue:
+        state, blank = queue.popleft()
+        for target, _ in moves[blank]:
+            tile = (state >> (target * bits)) & mask
+            new_state = state ^ (tile << (target * bits)) ^ (tile << (blank * bits))
+            if new_state not in depth:
+                depth[new_state] = depth[state] + 1
+                if depth[new_state] == len(firsts):
+                    firsts.append(new_state)
+                queue.append((new_state, target))
+    return [(f'depth-{d}', board_text(state, size)) for d, state in enumerate(firsts)]
+
+#Korf's 100 15-puzzle instances, read from a file since the set is not shipped here. A line is
+#"id t0 .. t15" or just the 16 tiles, in Korf's layout (goal 0 1 .. 15, blank first). Rotating the
+#board half a turn and renaming tile t to 16 - t maps that goal onto ours and keeps every distance.
+def korf_instances(path):
+    instances = []
+    with open(path) as file:
+        for line in file:
+            numbers = [int(number) for number in line.split()]
+            if len(numbers) < 16:
+                continue
+            name = f'korf-{numbers[0]}' if len(numbers) > 16 else f'korf-{len(instances) + 1}'
+            tiles = numbers[-16:] if len(numbers) == 16 else numbers[1:17]
+            instances.append((name, ' '.join(str((16 - tile) % 16) for tile in reversed(tiles))))
+    return instances
+
+#Seeded 5x5 boards made by random walks from the goal, so the difficulty stays in reach
+def random_instances(size, count, walk_length, seed):
+    rng = random.Random(seed)
+    bits = tile_bits(size)
+    mask = (1 << bits) - 1
+    moves = move_table(size)
+    instances = []
+    for number in range(count):
+        state, blank = make_goal_state(size), size * size - 1
+        for _ in range(walk_length):
+            target, _ = rng.choice(moves[blank])
+            tile = (state >> (target * bits)) & mask
+            state ^= (tile << (target * bits)) ^ (tile << (blank * bits))
+            blank = target
+        instances.append((f'random{size}-{seed}-{number}', board_text(state, size)))
+    return instances
+
+#Running one instance set with one choice and frontier, in its own process so the peak RSS belongs
+#to it alone
+def run_group(instance_set, instances, choice, timeout, frontier='bucket'):
+    for _ in warm_tables(enumerate(board for _, board in instances[:1]), choice):
+        pass
+    rows = []
+    for index, (name, board) in enumerate(instances):
+        record = solve_item((index, board), choice, timeout, frontier=frontier)
+        record['name'] = name
+        rows.append(record)
+    return {'set': instance_set, 'choice': choice, 'label': SEARCH_CHOICES[choice][0], 'frontier': frontier,
+            'instances': rows,
+            'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+
+#Totals over the instances that finished, plus how many failed or timed out
+def summarize(group):
+    solved = [row for row in group['instances'] if 'error' not in row]
+    nodes = sum(row['nodes_expanded'] for row in solved)
+    wall_time = sum(row['wall_time'] for row in solved)
+    return {'set': group['set'], 'choice': group['choice'], 'label': group['label'], 'frontier': group['frontier'],
+            'solved': len(solved), 'failed': len(group['instances']) - len(solved),
+            'nodes_expanded': nodes, 'nodes_per_second': round(nodes / wall_time) if wall_time else 0,
+            'peak_frontier': max((row['max_queue_size'] for row in solved), default=0),
+            'peak_rss_mb': round(group['peak_rss_kb'] / 1024, 1), 'wall_time': round(wall_time, 3)}
+
+def print_table(summaries, baseline=None):
+    header = f"{'set':<9}{'choice':<36}{'queue':>7}{'solved':>7}{'failed':>7}{'nodes':>12}{'nodes/s':>10}" \
+             f"{'frontier':>10}{'rss MB':>8}{'time s':>9}"
+    print(header + ('   vs baseline' if baseline else ''))
+    for row in summaries:
+        line = f"{row['set']:<9}{str(row['choice']) + ' ' + row['label']:<36}{row['frontier']:>7}{row['solved']:>7}{row['failed']:>7}" \
+               f"{row['nodes_expanded']:>12}{row['nodes_per_second']:>10}{row['peak_frontier']:>10}" \
+               f"{row['peak_rss_mb']:>8}{row['wall_time']:>9}"
+        old = (baseline or {}).get((row['set'], row['choice'], row['frontier']))
+        if old and old['nodes_per_second']:
+            line += f"   {row['nodes_per_second'] / old['nodes_per_second']:.2f}x nodes/s, " \
+                    f"{row['nodes_expanded'] - old['nodes_expanded']:+d} nodes"
+        print(line)
+
+#Baseline summaries by (set, choice, frontier); files from before the frontier was recorded used buckets
+def load_baseline(path):
+    with open(path) as file:
+        return {(row['set'], row['choice'], row.get('frontier', 'bucket')): row for row in json.load(file)['summaries']}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the standard instance sets over the search choices.")
+    parser.add_argument('--sets', default='eight,random5', help="comma separated: eight, korf100, random5")
+    parser.add_argument('--choices', help="comma separated search choices, default depends on the set")
+    parser.add_argument('--korf-file', help="Korf 100 instance file, needed for the korf100 set")
+    parser.add_argument('--count', type=int, default=10, help="random 5x5 instances")
+    parser.add_argument('--walk-length', type=int, default=40, help="random walk length of 5x5 instances")
+    parser.add_argument('--seed', type=int, default=205, help="seed of the 5x5 instances")
+    parser.add_argument('--timeout', type=float, default=60, help="seconds allowed per instance")
+    parser.add_argument('--json', help="write per-instance results and summaries to this file")
+    parser.add_argument('--baseline', help="earlier --json output to compare against")
+    parser.add_argument('--frontiers', default='bucket',
+                        help="comma separated open lists to run the graph searches with: " + ", ".join(FRONTIERS))
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    sets = {}
+    for name in args.sets.split(','):
+        if name == 'eight':
+            sets[name] = eight_instances()
+        elif name == 'korf100':
+            if not args.korf_file:
+                sys.exit("The korf100 set needs --korf-file with the 100 instances.")
+            sets[name] = korf_instances(args.korf_file)
+        elif name == 'random5':
+            sets[name] = random_instances(5, args.count, args.walk_length, args.seed)
+        else:
+            sys.exit(f"Unknown instance set '{name}'.")
+    frontiers = args.frontiers.split(',')
+    for frontier in frontiers:
+        if frontier not in FRONTIERS:
+            sys.exit(f"Unknown frontier '{frontier}'. Choose from: {', '.join(FRONTIERS)}")
+    groups = []
+    for name, instances in sets.items():
+        choices = [int(choice) for choice in args.choices.split(',')] if args.choices else DEFAULT_CHOICES[name]
+        for choice in choices:
+            for frontier in frontiers:
+                with Pool(1) as pool:
+                    groups.append(pool.apply(run_group, (name, instances, choice, args.timeout, frontier)))
+                print(f"finished {name} choice {choice} with the {frontier} frontier", file=sys.stderr)
+    summaries = [summarize(group) for group in groups]
+    print_table(summaries, load_baseline(args.baseline) if args.baseline else None)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(), 'date': time.time(),
+                       'arguments': vars(args), 'summaries': summaries, 'groups': groups}, file, indent=1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+from collections import OrderedDict
+
+from nine import DIRECTIONS, find_blank_tile, tile_bits
+
+DEFAULT_CAPACITY = 1 << 20
+STEPS = tuple(DIRECTIONS.values())
+
+#Board after the blank takes one move (an index into DIRECTIONS), and the blank's new cell
+def step(state, blank, move, size, bits):
+    dr, dc = STEPS[move]
+    target = blank + dr * size + dc
+    tile = (state >> (target * bits)) & ((1 << bits) - 1)
+    return state ^ (tile << (target * bits)) ^ (tile << (blank * bits)), target
+
+#Process-wide transposition cache of solved states: (packed state, goal) -> (exact distance, best
+#move of the blank). Every state on a solved optimal path is stored, so a later board that lands
+#anywhere on that path is answered by following best moves. Least recently used entries go first
+#once the cache holds capacity states; a path broken by an eviction reads as a miss.
+class TranspositionCache:
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.probes = 0
+        self.probe_hits = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def put(self, state, goal, distance, move):
+        key = (state, goal)
+        self.entries[key] = (distance, move)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    #Move codes of an optimal path from state to goal, or None when it is not cached. Lookups of
+    #whole boards count in hits and misses; a search probing its popped nodes passes probe=True,
+    #which counts in probes and probe_hits instead, and the blank's cell it already knows.
+    def moves(self, state, goal, size, blank=None, probe=False):
+        entries = self.entries
+        entry = entries.get((state, goal))
+        if probe:
+            self.probes += 1
+        if entry is not None:
+            bits = tile_bits(size)
+            if blank is None:
+                blank_row, blank_col = find_blank_tile(state, size)
+                blank = blank_row * size + blank_col
+            path = []
+            while entry is not None and entry[0]:
+                entries.move_to_end((state, goal))
+                path.append(entry[1])
+                state, blank = step(state, blank, entry[1], size, bits)
+                entry = entries.get((state, goal))
+        if entry is None:
+            if not probe:
+                self.misses += 1
+            return None
+        if probe:
+            self.probe_hits += 1
+        else:
+            self.hits += 1
+        return path
+
+    #Storing every state of an optimal solution from state, each one len(moves) - i moves away
+    def store_path(self, state, goal, size, moves):
+        bits = tile_bits(size)
+        blank_row, blank_col = find_blank_tile(state, size)
+        blank = blank_row * size + blank_col
+        for index, move in enumerate(moves):
+            self.put(state, goal, len(moves) - index, move)
+            state, blank = step(state, blank, move, size, bits)
+        self.put(state, goal, 0, -1)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'entries': len(self.entries), 'capacity': self.capacity, 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'probes': self.probes, 'probe_hits': self.probe_hits}
+
+_shared = None
+
+#The cache shared by every search in this process, created on first use
+def shared_cache(capacity=DEFAULT_CAPACITY):
+    global _shared
+    if _shared is None:
+        _shared = TranspositionCache(capacity)
+    return _shared
@@ -0,0 +1,48 @@
+import argparse
+import json
+import socket
+import sys
+
+from batch import read_boards
+from server import DEFAULT_SOCKET
+
+#Sending boards to a running server.py over one connection and collecting the answers in order
+def solve(boards, socket_path=DEFAULT_SOCKET, choice=None, timeout=None):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        file = sock.makefile('rw')
+        for index, board in enumerate(boards):
+            request = {'id': index, 'board': board}
+            if choice is not None:
+                request['choice'] = choice
+            if timeout is not None:
+                request['timeout'] = timeout
+            file.write(json.dumps(request) + '\n')
+        file.flush()
+        #closing our side tells the server no more requests are coming
+        sock.shutdown(socket.SHUT_WR)
+        records = [json.loads(line) for line in file]
+    return sorted(records, key=lambda record: record['id'] if record['id'] is not None else -1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Send boards to a running solver server.")
+    parser.add_argument('boards', nargs='*', help="boards, tiles row by row; read from --input when omitted")
+    parser.add_argument('--input', default='-', help="file with one board per line, - for stdin")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help="Unix socket of the server")
+    parser.add_argument('--choice', type=int, help="search choice, the server's default when omitted")
+    parser.add_argument('--timeout', type=float, help="seconds allowed per board")
+    args = parser.parse_args()
+    if args.boards:
+        boards = args.boards
+    else:
+        source = sys.stdin if args.input == '-' else open(args.input)
+        boards = list(read_boards(source))
+    try:
+        records = solve(boards, args.socket, args.choice, args.timeout)
+    except (FileNotFoundError, ConnectionRefusedError):
+        sys.exit(f"No server is listening on {args.socket}, start one with: python server.py")
+    for record in records:
+        print(json.dumps(record))
+
+if __name__ == '__main__':
+    main()
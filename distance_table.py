@@ -0,0 +1,127 @@
+import argparse
+import mmap
+import os
+import sys
+from collections import deque
+from math import factorial
+
+from nine import INVERSE_MOVE, make_goal_state, move_table, tile_bits
+
+UNREACHED = 255
+SIZE = 3
+TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tables')
+
+def default_path():
+    return os.path.join(TABLE_DIR, f'distance_{SIZE}x{SIZE}.bin')
+
+#Number of solvable boards: half of all permutations
+def state_count(size=SIZE):
+    return factorial(size * size) // 2
+
+#Perfect hash of a solvable board: Lehmer code of the cells holding the blank and tiles 1..n*n-3.
+#The last two tiles take the two cells left, and with the blank's cell known only one of their
+#two orders is solvable, so ranks run 0..(n*n)!/2-1
+def rank_state(state, size=SIZE):
+    cells = size * size
+    bits = tile_bits(size)
+    mask = (1 << bits) - 1
+    where = [0] * cells
+    for index in range(cells):
+        where[(state >> (index * bits)) & mask] = index
+    used = 0
+    rank = 0
+    for tile in range(cells - 2):
+        position = where[tile]
+        rank = rank * (cells - tile) + position - (used & ((1 << position) - 1)).bit_count()
+        used |= 1 << position
+    return rank
+
+#One-time BFS from the goal giving the distance of every solvable board, one byte each
+def bfs_distances():
+    bits = tile_bits(SIZE)
+    mask = (1 << bits) - 1
+    moves = move_table(SIZE)
+    goal_state = make_goal_state(SIZE)
+    table = bytearray([UNREACHED]) * state_count()
+    table[rank_state(goal_state)] = 0
+    queue = deque([(goal_state, SIZE * SIZE - 1)])
+    while queue:
+        state, blank = queue.popleft()
+        d = table[rank_state(state)] + 1
+        for target, _ in moves[blank]:
+            tile = (state >> (target * bits)) & mask
+            new_state = state ^ (tile << (target * bits)) ^ (tile << (blank * bits))
+            rank = rank_state(new_state)
+            if table[rank] == UNREACHED:
+                table[rank] = d
+                queue.append((new_state, target))
+    return table
+
+#Writing the table file; the NumPy layer sweep in sweep.py gives the same bytes in a fraction of
+#the time when NumPy is installed
+def build_distance_table(path=None):
+    path = path or default_path()
+    from vector import np
+    if np is not None:
+        from sweep import sweep_ranked
+        table = sweep_ranked(SIZE).tobytes()
+    else:
+        table = bfs_distances()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + '.tmp', 'wb') as file:
+        file.write(table)
+    os.replace(path + '.tmp', path)
+    return path
+
+#Memory-mapping the table file, building it first if it does not exist yet
+def load_distance_table(path=None):
+    path = path or default_path()
+    if not os.path.exists(path):
+        print(f"Building the {SIZE}x{SIZE} distance table, this runs once...", file=sys.stderr)
+        build_distance_table(path)
+    with open(path, 'rb') as file:
+        table = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(table) != state_count():
+        raise ValueError(f"{path} is not a {SIZE}x{SIZE} distance table.")
+    return table
+
+#Exact number of moves to the goal for a solvable board
+def lookup_distance(table, state):
+    return table[rank_state(state)]
+
+#Optimal moves by greedy descent: some neighbour is always exactly one move closer
+def lookup_moves(table, state, blank):
+    bits = tile_bits(SIZE)
+    mask = (1 << bits) - 1
+    moves = move_table(SIZE)
+    path = []
+    d = table[rank_state(state)]
+    back = -1
+    while d:
+        for target, move in moves[blank]:
+            if move == back:
+                continue
+            tile = (state >> (target * bits)) & mask
+            new_state = state ^ (tile << (target * bits)) ^ (tile << (blank * bits))
+            if table[rank_state(new_state)] == d - 1:
+                break
+        path.append(move)
+        state, blank, back, d = new_state, target, INVERSE_MOVE[move], d - 1
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Build the exact {SIZE}x{SIZE} distance table file.")
+    parser.add_argument('--output', help="table file to write")
+    args = parser.parse_args()
+    path = build_distance_table(args.output)
+    table = load_distance_table(path)
+    histogram = [0] * 256
+    for d in memoryview(table):
+        histogram[d] += 1
+    while not histogram[-1]:
+        histogram.pop()
+    print(f"Wrote {path}: {len(table)} states, deepest {len(histogram) - 1} moves")
+    print("States per depth: " + " ".join(str(count) for count in histogram))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+import heapq
+
+#Nodes are NodeStore indices, so a whole heap entry is packed into one int
+#(f, then larger g first, then node index), and the heap only does int comparisons
+_SEQ_BITS = 32
+_G_BITS = 16
+_G_MAX = (1 << _G_BITS) - 1
+_SEQ_MASK = (1 << _SEQ_BITS) - 1
+
+
+#Packing f, g and the node index into a single integer entry
+def pack_priority(f, g, node):
+    return (f << (_G_BITS + _SEQ_BITS)) | ((_G_MAX - g) << _SEQ_BITS) | node
+
+
+#Lock-free binary heap frontier, works with any non-negative integer f
+class HeapFrontier:
+    def __init__(self):
+        self.heap = []
+
+    def push(self, node, f, g):
+        heapq.heappush(self.heap, pack_priority(f, g, node))
+
+    def pop(self):
+        return heapq.heappop(self.heap) & _SEQ_MASK
+
+    def min_f(self):
+        return self.heap[0] >> (_G_BITS + _SEQ_BITS)
+
+    def __len__(self):
+        return len(self.heap)
+
+
+#Bucket queue keyed by f, then by g, for the small integer f-values of sliding puzzles
+#Ties on f go to the deepest node, ties on (f, g) are LIFO
+class BucketFrontier:
+    def __init__(self):
+        self.buckets = []
+        self.lowest = 0
+        self.size = 0
+
+    def push(self, node, f, g):
+        buckets = self.buckets
+        while len(buckets) <= f:
+            buckets.append([])
+        by_g = buckets[f]
+        while len(by_g) <= g:
+            by_g.append([])
+        by_g[g].append(node)
+        if f < self.lowest:
+            self.lowest = f
+        self.size += 1
+
+    def pop(self):
+        by_g = self._first_bucket()
+        self.size -= 1
+        return by_g[-1].pop()
+
+    def min_f(self):
+        self._first_bucket()
+        return self.lowest
+
+    #Skipping empty buckets so the lowest f bucket ends with its highest non-empty g
+    def _first_bucket(self):
+        if not self.size:
+            raise IndexError("pop from an empty frontier")
+        buckets = self.buckets
+        f = self.lowest
+        while True:
+            by_g = buckets[f]
+            while by_g and not by_g[-1]:
+                by_g.pop()
+            if by_g:
+                self.lowest = f
+                return by_g
+            f += 1
+
+    def __len__(self):
+        return self.size
+
+
+FRONTIERS = {'heap': HeapFrontier, 'bucket': BucketFrontier}
+
+
+def make_frontier(kind='bucket'):
+    if kind not in FRONTIERS:
+        raise ValueError(f"Unknown frontier '{kind}'. Choose from: {', '.join(FRONTIERS)}")
+    return FRONTIERS[kind]()
@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import sys
+import time
+
+from batch import read_boards
+from benchmark import random_instances
+from server import DEFAULT_SOCKET
+
+#Nearest-rank percentile of a sorted list
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))]
+
+#One closed-loop client: a request goes out as soon as the previous answer came back
+async def run_client(socket_path, boards, choice, timeout, latencies, errors):
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    try:
+        for request_id, board in boards:
+            request = {'id': request_id, 'board': board, 'choice': choice}
+            if timeout is not None:
+                request['timeout'] = timeout
+            started = time.perf_counter()
+            writer.write((json.dumps(request) + '\n').encode())
+            await writer.drain()
+            record = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - started)
+            if 'error' in record:
+                errors.append(record['error'])
+    finally:
+        writer.close()
+
+async def run_load(args, boards):
+    #clients share one iterator, so the requests are spread over whichever client is free
+    work = zip(range(args.requests), itertools.cycle(boards))
+    latencies, errors = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(run_client(args.socket, work, args.choice, args.timeout, latencies, errors)
+                           for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {'requests': len(latencies), 'errors': len(errors), 'concurrency': args.concurrency,
+            'seconds': round(elapsed, 3), 'requests_per_second': round(len(latencies) / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p90_ms': round(percentile(latencies, 0.90) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0}
+
+def main():
+    parser = argparse.ArgumentParser(description="Load a running solver server and report latency percentiles.")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help="Unix socket of the server")
+    parser.add_argument('--input', help="file with one board per line, random boards when omitted")
+    parser.add_argument('--size', type=int, default=3, help="size of the random boards")
+    parser.add_argument('--walk-length', type=int, default=30, help="random walk length of the random boards")
+    parser.add_argument('--seed', type=int, default=205, help="seed of the random boards")
+    parser.add_argument('--requests', type=int, default=200, help="requests to send in total")
+    parser.add_argument('--concurrency', type=int, default=4, help="connections sending at the same time")
+    parser.add_argument('--choice', type=int, default=3, help="search choice of every request")
+    parser.add_argument('--timeout', type=float, help="seconds allowed per request")
+    args = parser.parse_args()
+    if args.input:
+        with open(args.input) as file:
+            boards = list(read_boards(file))
+    else:
+        boards = [board for _, board in random_instances(args.size, args.requests, args.walk_length, args.seed)]
+    try:
+        summary = asyncio.run(run_load(args, boards))
+    except (FileNotFoundError, ConnectionRefusedError):
+        sys.exit(f"No server is listening on {args.socket}, start one with: python server.py")
+    print(json.dumps(summary))
+
+if __name__ == '__main__':
+    main()
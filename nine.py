@@ -1,103 +1,1180 @@
-from queue import PriorityQueue
+import argparse
+import heapq
+import math
+import signal
+import sys
+import threading
+import time
+from array import array
+from collections import deque
+from functools import lru_cache
+from itertools import count
 
-#Creating new node
-def make_node(state, parent=None, cost=0, depth=0):
-    return {'state': state, 'parent': parent, 'cost': cost, 'depth': depth}
+from frontier import FRONTIERS, make_frontier
+from visited import VISITED_KINDS, make_visited, visited_bytes
 
-#Creating priority queue
-def make_queue(node):
-    queue = PriorityQueue()
-    queue.put((node['cost'], id(node), node))
+#Node store kept as parallel arrays, a node is just an index into them
+#A node's link packs its parent index and the 2-bit code of the move that made it (parent << 2 | move,
+#-1 for the root), so no node object is kept alive by its children and the path costs 8 bytes a node
+class NodeStore:
+    def __init__(self, size):
+        self.size = size
+        #packed states fit in 64 bits up to 4x4, bigger boards keep them as Python ints
+        self.states = array('Q') if tile_bits(size) * size * size <= 64 else []
+        self.link = array('q')
+        self.cost = array('I')
+        self.h = array('H')
+        self.blank = array('B')
+
+    def __len__(self):
+        return len(self.link)
+
+    #Measured memory per stored node, including int objects for boards above 4x4
+    def bytes_per_node(self):
+        if not len(self):
+            return 0
+        total = sum(sys.getsizeof(buffer) for buffer in (self.states, self.link, self.cost, self.h, self.blank))
+        if isinstance(self.states, list):
+            total += sum(sys.getsizeof(state) for state in self.states)
+        return total / len(self)
+
+#Creating new node, move is the index 0..3 of the blank's direction in DIRECTIONS (-1 for the root)
+def make_node(store, state, blank, parent=-1, cost=0, move=-1, h=0):
+    store.states.append(state)
+    store.blank.append(blank)
+    store.link.append(parent << 2 | move if parent >= 0 else -1)
+    store.cost.append(cost)
+    store.h.append(h)
+    return len(store.link) - 1
+
+#Solution record: the final board, its cost, and the blank's moves from the initial state
+def make_result(state, size, moves):
+    return {'state': unpack_state(state, size), 'cost': len(moves), 'depth': len(moves),
+            'moves': ''.join(MOVE_LETTERS[move] for move in moves)}
+
+#Copying a finished node out of the store for reporting, the moves come from walking the parents
+def make_solution(store, node):
+    state = store.states[node]
+    return make_result(state, store.size, path_moves(store, node))
+
+#Move codes from the root to a node, read off the links
+def path_moves(store, node):
+    moves = []
+    link = store.link[node]
+    while link >= 0:
+        moves.append(link & 3)
+        link = store.link[link >> 2]
+    return moves[::-1]
+
+#Creating the search frontier ('bucket' or 'heap', see frontier.py)
+def make_queue(store, node, frontier='bucket'):
+    queue = make_frontier(frontier)
+    queue.push(node, store.cost[node] + store.h[node], store.cost[node])
     return queue
 
 #Popping the lowest cost node
 def remove_front(queue):
-    return queue.get()[2]
+    return queue.pop()
 
 #Chceking if the priority queue is empty or not
 def empty(queue):
-    return queue.empty()
+    return not queue
+
+#Bits per tile: 4-bit nibbles up to 4x4, wider fields once tile numbers need more
+def tile_bits(size):
+    return max(4, (size * size - 1).bit_length())
+
+#Packing a board of row tuples into one int, cell 0 in the lowest bits
+def pack_state(rows, size):
+    bits = tile_bits(size)
+    state = 0
+    for index, tile in enumerate(tile for row in rows for tile in row):
+        state |= tile << (index * bits)
+    return state
+
+#Unpacking an int state back to row tuples for printing
+def unpack_state(state, size):
+    bits = tile_bits(size)
+    mask = (1 << bits) - 1
+    cells = [(state >> (index * bits)) & mask for index in range(size * size)]
+    return tuple(tuple(cells[row * size:(row + 1) * size]) for row in range(size))
+
+#Reading the tile at a cell index of a packed state
+def get_tile(state, index, bits):
+    return (state >> (index * bits)) & ((1 << bits) - 1)
+
+#Sliding the tile at target into the blank, the blank field is 0 so one xor mask swaps both
+def move_blank(state, blank, target, bits):
+    tile = (state >> (target * bits)) & ((1 << bits) - 1)
+    return state ^ (tile << (target * bits)) ^ (tile << (blank * bits))
+
+#Goal state has tiles 1..n*n-1 in order with the blank in the last cell
+@lru_cache(maxsize=None)
+def make_goal_state(size):
+    goal_state = [list(range(1 + i * size, 1 + i * size + size)) for i in range(size)]
+    goal_state[-1][-1] = 0
+    return pack_state(goal_state, size)
+
+#Checking a board holds every number 0..n*n-1 exactly once
+def validate_tiles(rows, size):
+    if len(rows) != size or any(len(row) != size for row in rows):
+        raise ValueError("The size of the puzzle does not match the input rows. Please check your input.")
+    seen = [0] * (size * size)
+    for tile in (tile for row in rows for tile in row):
+        if not 0 <= tile < size * size:
+            raise ValueError(f"Tile {tile} is out of range, use the numbers 0 to {size * size - 1}.")
+        seen[tile] += 1
+    duplicates = [tile for tile, count in enumerate(seen) if count > 1]
+    missing = [tile for tile, count in enumerate(seen) if count == 0]
+    if duplicates or missing:
+        raise ValueError(f"Invalid tiles: duplicates {duplicates}, missing {missing}.")
+
+#A move is one transposition that shifts the blank by one cell, so a board is solvable exactly when
+#its permutation parity (counted in O(n) from the cycles) matches the parity of the blank's distance home
+def is_solvable(state, size):
+    cells = size * size
+    bits = tile_bits(size)
+    goal_cell = [(get_tile(state, index, bits) - 1) % cells for index in range(cells)]
+    seen = [False] * cells
+    cycles = 0
+    for start in range(cells):
+        if not seen[start]:
+            cycles += 1
+            index = start
+            while not seen[index]:
+                seen[index] = True
+                index = goal_cell[index]
+    blank_row, blank_col = divmod(goal_cell.index(cells - 1), size)
+    return (cells - cycles) % 2 == (2 * size - 2 - blank_row - blank_col) % 2
+
+#A well formed board whose tile parity does not match the goal
+class UnsolvableError(ValueError):
+    pass
+
+#Validating and packing a board at input time, unsolvable boards are rejected before any search
+def check_board(rows, size):
+    validate_tiles(rows, size)
+    state = pack_state(rows, size)
+    if not is_solvable(state, size):
+        raise UnsolvableError("This puzzle cannot be solved: its tile parity does not match the goal.")
+    return state
 
 #Finding position of blank tile (0) in the puzzle
 def find_blank_tile(state, size):
-    for i in range(size):
-        for j in range(size):
-            if state[i][j] == 0:
-                return i, j
+    bits = tile_bits(size)
+    for index in range(size * size):
+        if get_tile(state, index, bits) == 0:
+            return divmod(index, size)
     raise ValueError("No blank tile (0) found. Please verify input.")
 
+#Blank tile moves in 1 out of four direction in maximum case
+DIRECTIONS = {'up': (-1, 0), 'down': (1, 0), 'left': (0, -1), 'right': (0, 1)}
+#Move code that undoes each move code, and the letter printed for each
+INVERSE_MOVE = (1, 0, 3, 2)
+MOVE_LETTERS = 'UDLR'
+
+#For every blank cell, the (target cell, move code) pairs that stay on the board
+@lru_cache(maxsize=None)
+def move_table(size):
+    table = []
+    for blank in range(size * size):
+        blank_row, blank_col = divmod(blank, size)
+        moves = []
+        for move, (dr, dc) in enumerate(DIRECTIONS.values()):
+            new_row, new_col = blank_row + dr, blank_col + dc
+            if 0 <= new_row < size and 0 <= new_col < size:
+                moves.append((new_row * size + new_col, move))
+        table.append(tuple(moves))
+    return tuple(table)
+
+#Replaying a move string from a state, for checking answers
+def apply_moves(state, size, moves):
+    bits = tile_bits(size)
+    blank_row, blank_col = find_blank_tile(state, size)
+    for letter in moves:
+        dr, dc = list(DIRECTIONS.values())[MOVE_LETTERS.index(letter)]
+        if not (0 <= blank_row + dr < size and 0 <= blank_col + dc < size):
+            raise ValueError(f"Move {letter} leaves the board.")
+        state = move_blank(state, blank_row * size + blank_col, (blank_row + dr) * size + blank_col + dc, bits)
+        blank_row, blank_col = blank_row + dr, blank_col + dc
+    return state
+
+#Counters kept by general_search about its open and closed lists
+def make_stats():
+    return {'duplicates_pruned': 0, 'stale_pops': 0, 'reopened': 0}
+
+#Expansions between two looks at the clock and the budget
+CLOCK_EVERY = 256
+
+#Limits on a search, each None for no limit; time_limit counts from when the budget is made.
+#cancel is a threading.Event (anything with is_set) that another thread or a signal handler sets
+#to stop the search at its next check.
+def make_budget(max_expanded=None, time_limit=None, max_memory_mb=None, cancel=None):
+    return {'max_expanded': max_expanded, 'time_limit': time_limit, 'max_memory_mb': max_memory_mb,
+            'cancel': cancel, 'started': time.perf_counter()}
+
+#Nodes expanded at which the budget is looked at next: every CLOCK_EVERY, and exactly at the node limit
+def next_check(budget, nodes_expanded):
+    if budget is None:
+        return math.inf
+    #a time limit of 0 is over before the first expansion
+    if budget['time_limit'] is not None and budget['time_limit'] <= 0:
+        return nodes_expanded
+    check = nodes_expanded + CLOCK_EVERY
+    return min(check, budget['max_expanded']) if budget['max_expanded'] is not None else check
+
+#The limit a running search has hit ('cancelled', 'nodes', 'time' or 'memory'), None while it may
+#go on. memory is only called when there is a memory limit.
+def over_budget(budget, nodes_expanded, memory):
+    if budget['cancel'] is not None and budget['cancel'].is_set():
+        return 'cancelled'
+    if budget['max_expanded'] is not None and nodes_expanded >= budget['max_expanded']:
+        return 'nodes'
+    if budget['time_limit'] is not None and time.perf_counter() - budget['started'] > budget['time_limit']:
+        return 'time'
+    if budget['max_memory_mb'] is not None and memory() > budget['max_memory_mb'] * 1024 * 1024:
+        return 'memory'
+    return None
+
+#Memory the search itself holds: the node store, the best g and closed tables with their keys,
+#and one word per frontier entry
+def tracked_bytes(store, best_g, closed, queue):
+    total = sum(sys.getsizeof(buffer) for buffer in (store.states, store.link, store.cost, store.h, store.blank))
+    total += sys.getsizeof(best_g) + visited_bytes(closed) + 8 * len(queue)
+    return total + len(best_g) * sys.getsizeof(next(iter(best_g), 0))
+
+#Budget of a search that also takes its own time_limit (the anytime and beam searches): a copy of
+#the problem's budget whose time runs out at the earlier of the two
+def timed_budget(budget, time_limit):
+    if time_limit is None:
+        return budget
+    budget = dict(budget) if budget is not None else make_budget()
+    started = time.perf_counter()
+    if budget['time_limit'] is None or started + time_limit < budget['started'] + budget['time_limit']:
+        budget['time_limit'], budget['started'] = time_limit, started
+    return budget
+
+#Ending a search at a limit: the status and the limit go into stats next to the counters so far
+def stop_search(stats, limit, nodes_expanded, max_queue_size):
+    stats['status'] = 'cancelled' if limit == 'cancelled' else 'budget_exceeded'
+    stats['limit'] = limit
+    return "failure", nodes_expanded, max_queue_size
+
 #All possible nodes after expanding a move
-def expand(node, size, visited):
-    blank_row, blank_col = find_blank_tile(node['state'], size)
+#Only the slid tile changes position, so a table heuristic's child h is the parent's h plus one
+#table delta, other heuristics get the move through their 'update' function.
+#A child is only kept when it is cheaper than the best g seen for its state; a cheaper path to a
+#closed state reopens it.
+#timers and hooks are only passed by an observed search (see general_search), which times the
+#duplicate checks and the heuristic and calls on_duplicate and on_generate
+def expand(store, node, size, best_g, closed, stats, heuristic=None, timers=None, hooks=None):
+    table = heuristic['table'] if heuristic is not None else None
+    update = heuristic['update'] if heuristic is not None else None
+    clock = time.perf_counter
+    state = store.states[node]
+    blank = store.blank[node]
+    cost = store.cost[node] + 1
+    h = store.h[node]
+    link = store.link[node]
+    back = INVERSE_MOVE[link & 3] if link >= 0 else -1
+    cells = size * size
+    bits = tile_bits(size)
+    mask = (1 << bits) - 1
     new_nodes = []
-    #blank tile moves in 1 out of four direction in maximum case
-    directions = {'up': (-1, 0), 'down': (1, 0), 'left': (0, -1), 'right': (0, 1)}
-    for direction, (dr, dc) in directions.items():
-        new_row, new_col = blank_row + dr, blank_col + dc
-        if 0 <= new_row < size and 0 <= new_col < size:
-            new_state = [list(row) for row in node['state']]
-            #blank tile is swapped with target
-            new_state[blank_row][blank_col], new_state[new_row][new_col] = new_state[new_row][new_col], \
-            new_state[blank_row][blank_col]
-            new_state = tuple(map(tuple, new_state))
-            if new_state not in visited:
-                visited.add(new_state)
-                new_nodes.append(make_node(new_state, node, node['cost'] + 1, node['depth'] + 1))
+    for target, move in move_table(size)[blank]:
+        #moving straight back only regenerates the parent
+        if move == back:
+            continue
+        #blank tile is swapped with target
+        tile = (state >> (target * bits)) & mask
+        new_state = state ^ (tile << (target * bits)) ^ (tile << (blank * bits))
+        if timers is not None:
+            tick = clock()
+        old_g = best_g.get(new_state)
+        duplicate = old_g is not None and cost >= old_g
+        if timers is not None:
+            timers['duplicates'] += clock() - tick
+        if duplicate:
+            stats['duplicates_pruned'] += 1
+            if hooks is not None:
+                hooks['on_duplicate'](store, node, new_state, cost)
+            continue
+        best_g[new_state] = cost
+        #only a state seen before can be closed, which spares the closed test for new states
+        if old_g is not None and new_state in closed:
+            closed.discard(new_state)
+            stats['reopened'] += 1
+        if timers is not None:
+            tick = clock()
+        if table is not None:
+            new_h = h - table[tile * cells + target] + table[tile * cells + blank]
+        elif update is not None:
+            new_h = update(h, new_state, tile, target, blank)
+        else:
+            new_h = 0
+        if timers is not None:
+            timers['heuristic'] += clock() - tick
+        child = make_node(store, new_state, target, node, cost, move, new_h)
+        new_nodes.append(child)
+        if hooks is not None:
+            hooks['on_generate'](store, child)
     return new_nodes
 
-def get_user_input():
-    size = int(input("Enter puzzle size 3 for 3x3, 4 for 4x4): "))
-    initial_state = []
-    print("Enter the initial state of the puzzle (use 0 for the blank):")
-    for i in range(size):
-        row = input(f"Enter row {i + 1} (space-separated numbers): ")
-        initial_state.append(tuple(map(int, row.split())))
+#Per tile, per position cost of the misplaced tiles heuristic, indexed tile * cells + position
+@lru_cache(maxsize=None)
+def misplaced_tiles_table(size):
+    cells = size * size
+    return tuple(0 if tile == 0 or position == (tile - 1) % cells else 1
+                 for tile in range(cells) for position in range(cells))
 
-    if len(initial_state) != size or any(len(row) != size for row in initial_state):
-        raise ValueError("The size of the puzzle does not match the input rows. Please check your input.")
+#Per tile, per position Manhattan distance to the tile's goal cell, indexed tile * cells + position
+@lru_cache(maxsize=None)
+def manhattan_distance_table(size):
+    cells = size * size
+    table = []
+    for tile in range(cells):
+        goal_row, goal_col = divmod((tile - 1) % cells, size)
+        for position in range(cells):
+            row, col = divmod(position, size)
+            table.append(0 if tile == 0 else abs(row - goal_row) + abs(col - goal_col))
+    return tuple(table)
 
-    initial_state = tuple(initial_state)
-    print("Choose the search method: 1 for UCS, 2 for A* Misplaced Tile, 3 for A* Manhattan Distance")
-    choice = int(input("Your choice: "))
-    return initial_state, choice, size
+#Full heuristic value of a state from a cost table, only needed for the root
+def evaluate_table(state, table, size):
+    bits = tile_bits(size)
+    cells = size * size
+    return sum(table[get_tile(state, index, bits) * cells + index] for index in range(cells))
+
+def heuristic_misplaced_tiles(state, size):
+    return evaluate_table(state, misplaced_tiles_table(size), size)
 
+def heuristic_manhattan_distance(state, size):
+    return evaluate_table(state, manhattan_distance_table(size), size)
 
-def heuristic_misplaced_tiles(state, goal_state, size):
-    return sum(1 for i in range(size) for j in range(size) if state[i][j] != 0 and state[i][j] != goal_state[i][j])
+#A heuristic is a dict: 'evaluate' scores a whole state, and either 'table' (a per-tile,
+#per-position table applied inline by expand) or 'update' gives a child's h after one move:
+#update(parent_h, child_state, tile, from_cell, to_cell)
+def make_table_heuristic(table, size):
+    return {'table': table, 'evaluate': lambda state: evaluate_table(state, table, size), 'update': None}
 
-def heuristic_manhattan_distance(state, goal_positions, size):
-    return sum(abs(i - goal_positions[state[i][j]][0]) + abs(j - goal_positions[state[i][j]][1])
-               for i in range(size) for j in range(size) if state[i][j] != 0)
+@lru_cache(maxsize=None)
+def misplaced_tiles_heuristic(size):
+    return make_table_heuristic(misplaced_tiles_table(size), size)
+
+@lru_cache(maxsize=None)
+def manhattan_distance_heuristic(size):
+    return make_table_heuristic(manhattan_distance_table(size), size)
+
+#Additive pattern databases live in pattern_database.py, which imports this module
+@lru_cache(maxsize=None)
+def pattern_database_heuristic(size):
+    from pattern_database import load_heuristic
+    return load_heuristic(size)
+
+#Extra moves forced by one row or column: every tile that has to leave the line to let the
+#others pass costs 2, and at least (tiles in their goal line - longest in-order run) must leave
+def line_conflicts(goal_slots):
+    longest = [1] * len(goal_slots)
+    for i in range(len(goal_slots)):
+        for j in range(i):
+            if goal_slots[j] < goal_slots[i] and longest[j] + 1 > longest[i]:
+                longest[i] = longest[j] + 1
+    return 2 * (len(goal_slots) - max(longest, default=0))
+
+#Manhattan distance plus linear conflicts, conflicts are cached per line content and a move only
+#recomputes the two lines it crosses (rows for up/down moves, columns for left/right moves)
+@lru_cache(maxsize=None)
+def linear_conflict_heuristic(size):
+    cells = size * size
+    bits = tile_bits(size)
+    mask = (1 << bits) - 1
+    table = manhattan_distance_table(size)
+    caches = {}
+
+    def line(state, kind, number):
+        cache = caches.setdefault((kind, number), {})
+        step = 1 if kind == 'row' else size
+        first = number * size if kind == 'row' else number
+        key = 0
+        for index in range(first, first + step * size, step):
+            key = (key << bits) | ((state >> (index * bits)) & mask)
+        conflicts = cache.get(key)
+        if conflicts is None:
+            slots = []
+            for index in range(first, first + step * size, step):
+                tile = (state >> (index * bits)) & mask
+                goal_row, goal_col = divmod(tile - 1, size)
+                if tile and (goal_row if kind == 'row' else goal_col) == number:
+                    slots.append(goal_col if kind == 'row' else goal_row)
+            conflicts = cache[key] = line_conflicts(slots)
+        return conflicts
+
+    def evaluate(state):
+        return evaluate_table(state, table, size) + sum(line(state, kind, number)
+                                                        for kind in ('row', 'col') for number in range(size))
+
+    def update(h, state, tile, from_cell, to_cell):
+        parent = state ^ (tile << (from_cell * bits)) ^ (tile << (to_cell * bits))
+        h += table[tile * cells + to_cell] - table[tile * cells + from_cell]
+        from_row, from_col = divmod(from_cell, size)
+        to_row, to_col = divmod(to_cell, size)
+        kind, lines = ('row', (from_row, to_row)) if from_col == to_col else ('col', (from_col, to_col))
+        for number in lines:
+            h += line(state, kind, number) - line(parent, kind, number)
+        return h
+
+    return {'table': None, 'evaluate': evaluate, 'update': update}
+
+#Walking distance table: a state is how many tiles of each goal row sit in each row, plus the
+#blank's row, and a move carries one tile between the blank's row and a neighbouring row.
+#BFS from the goal gives the fewest vertical moves, and by symmetry the same table serves columns.
+@lru_cache(maxsize=None)
+def walking_distance_table(size):
+    goal = [[0] * size for _ in range(size)]
+    for row in range(size):
+        goal[row][row] = size if row < size - 1 else size - 1
+    start = (tuple(map(tuple, goal)), size - 1)
+    distance = {start: 0}
+    queue = deque([start])
+    while queue:
+        counts, blank_row = queue.popleft()
+        d = distance[counts, blank_row]
+        for row in (blank_row - 1, blank_row + 1):
+            if not 0 <= row < size:
+                continue
+            for goal_row in range(size):
+                if counts[row][goal_row]:
+                    new_counts = [list(line) for line in counts]
+                    new_counts[row][goal_row] -= 1
+                    new_counts[blank_row][goal_row] += 1
+                    key = (tuple(map(tuple, new_counts)), row)
+                    if key not in distance:
+                        distance[key] = d + 1
+                        queue.append(key)
+    return distance
+
+#Walking distance: table lookups for the row and the column view of the board
+@lru_cache(maxsize=None)
+def walking_distance_heuristic(size):
+    if size > 4:
+        raise ValueError("Walking distance tables are only built for boards up to 4x4.")
+    cells = size * size
+    bits = tile_bits(size)
+    mask = (1 << bits) - 1
+    distance = walking_distance_table(size)
+
+    def evaluate(state):
+        rows = [[0] * size for _ in range(size)]
+        cols = [[0] * size for _ in range(size)]
+        for index in range(cells):
+            tile = (state >> (index * bits)) & mask
+            row, col = divmod(index, size)
+            if tile:
+                goal_row, goal_col = divmod(tile - 1, size)
+                rows[row][goal_row] += 1
+                cols[col][goal_col] += 1
+            else:
+                blank_row, blank_col = row, col
+        return distance[tuple(map(tuple, rows)), blank_row] + distance[tuple(map(tuple, cols)), blank_col]
+
+    return {'table': None, 'evaluate': evaluate, 'update': lambda h, state, tile, from_cell, to_cell: evaluate(state)}
 
 #Code for general search, which can be modified to implement all 3 methods by different queue implementations
-def general_search(problem, queueing_function, size):
-    nodes = make_queue(make_node(problem['initial_state']))
-    visited = {problem['initial_state']}
+#best_g holds the cheapest g found per state, and queue entries that were beaten after being pushed
+#are dropped when popped (lazy deletion) instead of being searched for in the queue
+#With a transposition cache (cache.py) a popped node whose state was solved before gets its exact
+#distance as h and goes back on the queue; once it pops with that h it is on an optimal path, and
+#the cached moves finish the solution. These probes count apart from the cache's hits and misses.
+#A problem['budget'] from make_budget stops the search at its first limit, see stop_search
+#An observer (make_observer) adds its hooks, a generated node counter and monotonic timers for
+#expand (which includes the heuristic and duplicate checks), heuristic evaluation, frontier
+#operations and duplicate checks, which land in stats['timers']. Counts and results are the same
+#with or without one; without one every timer and hook is skipped by a None check.
+def general_search(problem, queueing_function, size, frontier='bucket', stats=None, observer=None):
+    clock = time.perf_counter
+    stats = stats if stats is not None else {}
+    stats.update(make_stats())
+    timers = hooks = None
+    if observer is not None:
+        hooks = {name: observer.get(name) or no_hook for name in HOOKS}
+        timers = stats['timers'] = {'expand': 0.0, 'heuristic': 0.0, 'frontier': 0.0, 'duplicates': 0.0,
+                                    'total': 0.0}
+    started = clock()
+    store = NodeStore(size)
+    heuristic = problem['heuristic']
+    root = problem['initial_state']
+    root_h = heuristic['evaluate'](root) if heuristic is not None else 0
+    if timers is not None:
+        timers['heuristic'] += clock() - started
+    blank_row, blank_col = find_blank_tile(root, size)
+    nodes = make_queue(store, make_node(store, root, blank_row * size + blank_col, h=root_h), frontier)
+    best_g = {root: 0}
+    closed = make_visited(size, tile_bits(size), problem['visited'])
+    cache = problem['cache']
+    budget = problem['budget']
+    check_at = next_check(budget, 0)
     max_queue_size = 1
     nodes_expanded = 0
+    result = "failure"
     while not empty(nodes):
+        if timers is not None:
+            tick = clock()
         node = remove_front(nodes)
-        if problem['goal_test'](node['state']):
-            return node, nodes_expanded, max_queue_size
-        new_nodes = expand(node, size, visited)
-        nodes, max_queue_size = queueing_function(nodes, new_nodes, max_queue_size)
+        if timers is not None:
+            timers['frontier'] += clock() - tick
+        state = store.states[node]
+        if store.cost[node] > best_g[state]:
+            stats['stale_pops'] += 1
+            continue
+        if problem['goal_test'](state):
+            if hooks is not None:
+                hooks['on_goal'](store, node)
+            result = make_solution(store, node)
+            break
+        if cache is not None:
+            tail = cache.moves(state, problem['goal_state'], size, store.blank[node], probe=True)
+            if tail is not None:
+                if store.h[node] == len(tail):
+                    result = make_result(problem['goal_state'], size, path_moves(store, node) + tail)
+                    break
+                #queued as deep as the goal it leads to, so it wins the ties of its f
+                store.h[node] = len(tail)
+                nodes.push(node, store.cost[node] + len(tail), store.cost[node] + len(tail))
+                continue
+        if nodes_expanded >= check_at:
+            limit = over_budget(budget, nodes_expanded, lambda: tracked_bytes(store, best_g, closed, nodes))
+            if limit is not None:
+                stop_search(stats, limit, nodes_expanded, max_queue_size)
+                break
+            check_at = next_check(budget, nodes_expanded)
+        closed.add(state)
+        if hooks is not None:
+            hooks['on_expand'](store, node)
+            expand_started = clock()
+        new_nodes = expand(store, node, size, best_g, closed, stats, heuristic, timers, hooks)
+        if timers is not None:
+            tick = clock()
+            timers['expand'] += tick - expand_started
+        nodes, max_queue_size = queueing_function(nodes, new_nodes, store, max_queue_size)
+        if timers is not None:
+            timers['frontier'] += clock() - tick
         nodes_expanded += 1
-    return "failure", nodes_expanded, max_queue_size
+    if timers is not None:
+        #every node but the root was generated as some node's child
+        stats['generated'] = len(store) - 1
+        timers['total'] = clock() - started
+    return result, nodes_expanded, max_queue_size
+
+#An observer is a dict of optional hooks, each called with the node store and a node index:
+#on_expand(store, node), on_generate(store, node), on_goal(store, node), and
+#on_duplicate(store, node, state, g) for a pruned child of node. An empty dict just collects timings.
+HOOKS = ('on_expand', 'on_generate', 'on_duplicate', 'on_goal')
+
+def make_observer(on_expand=None, on_generate=None, on_duplicate=None, on_goal=None):
+    hooks = {'on_expand': on_expand, 'on_generate': on_generate, 'on_duplicate': on_duplicate, 'on_goal': on_goal}
+    return {name: hook for name, hook in hooks.items() if hook is not None}
+
+def no_hook(*args):
+    pass
 
 #For UCS, cost is given the priority
-def ucs_queueing_function(queue, new_nodes, max_queue_size):
+def ucs_queueing_function(queue, new_nodes, store, max_queue_size):
     for node in new_nodes:
-        queue.put((node['cost'], id(node), node))
-    return queue, max(max_queue_size, queue.qsize())
+        queue.push(node, store.cost[node], store.cost[node])
+    return queue, max(max_queue_size, len(queue))
 
 #For A*, total cost is given the priority
-def a_star_heuristic_function(queue, new_nodes, heuristic_function, max_queue_size):
+#The heuristic value was already filled in by expand
+def a_star_heuristic_function(queue, new_nodes, store, max_queue_size):
     for node in new_nodes:
-        h_cost = heuristic_function(node['state'])
+        h_cost = store.h[node]
         #Total cost is sum of actual cost and heuristic cost
-        total_cost = node['cost'] + h_cost
-        queue.put((total_cost, id(node), node))
-    return queue, max(max_queue_size, queue.qsize())
+        total_cost = store.cost[node] + h_cost
+        queue.push(node, total_cost, store.cost[node])
+    return queue, max(max_queue_size, len(queue))
+
+#IDA*: depth first search on one mutable board, with an f bound raised to the smallest
+#f that exceeded it after every iteration. Memory is linear in the solution depth.
+#max_queue_size reports the deepest path held on the stack.
+#problem['budget'] is checked as in general_search, counting the nodes of every iteration.
+def ida_star_search(problem, size, stats=None):
+    cells = size * size
+    bits = tile_bits(size)
+    heuristic = problem['heuristic'] if problem['heuristic'] is not None else \
+        make_table_heuristic((0,) * (cells * cells), size)
+    table = heuristic['table']
+    update = heuristic['update']
+    moves = move_table(size)
+    goal_state = problem['goal_state']
+    budget = problem['budget']
+    stats = stats if stats is not None else {}
+    board = list(sum(unpack_state(problem['initial_state'], size), ()))
+    path = []
+    iterations = []
+    #negative results end the search: found leaves the solution in path, stopped hit the budget
+    found = -1
+    stopped = -2
+    limit = None
+    nodes_expanded = 0
+    max_queue_size = 1
+    iteration_nodes = 0
+    check_at = next_check(budget, 0)
+
+    def depth_first(state, blank, g, h, bound, back):
+        nonlocal iteration_nodes, max_queue_size, check_at, limit
+        f = g + h
+        if f > bound:
+            return f
+        if state == goal_state:
+            return found
+        if nodes_expanded + iteration_nodes >= check_at:
+            limit = over_budget(budget, nodes_expanded + iteration_nodes,
+                                lambda: sys.getsizeof(board) + sys.getsizeof(path))
+            if limit is not None:
+                return stopped
+            check_at = next_check(budget, nodes_expanded + iteration_nodes)
+        iteration_nodes += 1
+        if g + 1 > max_queue_size:
+            max_queue_size = g + 1
+        next_bound = float('inf')
+        for target, move in moves[blank]:
+            if move == back:
+                continue
+            #slide the tile in place, and slide it back after the subtree is done
+            tile = board[target]
+            board[blank], board[target] = tile, 0
+            new_state = state ^ (tile << (target * bits)) ^ (tile << (blank * bits))
+            if table is not None:
+                new_h = h - table[tile * cells + target] + table[tile * cells + blank]
+            else:
+                new_h = update(h, new_state, tile, target, blank)
+            path.append(move)
+            t = depth_first(new_state, target, g + 1, new_h, bound, INVERSE_MOVE[move])
+            if t < 0:
+                return t
+            path.pop()
+            board[blank], board[target] = 0, tile
+            if t < next_bound:
+                next_bound = t
+        return next_bound
+
+    root_h = heuristic['evaluate'](problem['initial_state'])
+    bound = root_h
+    while True:
+        iteration_nodes = 0
+        t = depth_first(problem['initial_state'], board.index(0), 0, root_h, bound, -1)
+        nodes_expanded += iteration_nodes
+        iterations.append((bound, iteration_nodes))
+        stats['iterations'] = iterations
+        if t == found:
+            return make_result(goal_state, size, path), nodes_expanded, max_queue_size
+        if t == stopped:
+            return stop_search(stats, limit, nodes_expanded, max_queue_size)
+        if t == float('inf'):
+            return "failure", nodes_expanded, max_queue_size
+        bound = t
+
+#Default node budget of the memory-bounded search, about 100 MB of BoundedNode objects
+NODE_BUDGET = 500000
+
+#Node of the memory-bounded search. 'pending' holds the (target, move) pairs not generated yet,
+#'children' the ones in memory by move, and 'forgotten' the f of pruned children by move,
+#so the parent still knows what regenerating them is worth.
+class BoundedNode:
+    __slots__ = ('state', 'blank', 'parent', 'move', 'g', 'f', 'h', 'pending', 'children', 'forgotten',
+                 'queued', 'version')
+
+    def __init__(self, state, blank, parent, move, g, h, f, pending):
+        self.state = state
+        self.blank = blank
+        self.parent = parent
+        self.move = move
+        self.g = g
+        self.h = h
+        self.f = f
+        self.pending = pending
+        self.children = {}
+        self.forgotten = {}
+        self.queued = False
+        self.version = 0
+
+#SMA*: A* that never holds more than max_nodes nodes. The best node (lowest f, deepest) generates
+#one successor at a time; once the budget is exceeded the worst leaf (highest f, shallowest) is
+#pruned and its f is remembered by the parent, which goes back on the queue with that f. A parent
+#whose successors are all generated backs the lowest f of its children up to its ancestors.
+#Nodes that can not be expanded within the budget get f = inf, the search fails when the root does.
+#max_queue_size reports the most nodes held at once. problem['budget'] is checked as in
+#general_search; its memory is estimated from the nodes held and the heap entries.
+def sma_star_search(problem, size, stats=None, max_nodes=NODE_BUDGET):
+    cells = size * size
+    bits = tile_bits(size)
+    mask = (1 << bits) - 1
+    heuristic = problem['heuristic'] if problem['heuristic'] is not None else \
+        make_table_heuristic((0,) * (cells * cells), size)
+    table = heuristic['table']
+    update = heuristic['update']
+    moves = move_table(size)
+    goal_state = problem['goal_state']
+    best, worst = [], []
+    entries = count()
+    stats = stats if stats is not None else {}
+    stats.update(pruned=0, regenerated=0)
+
+    def successors(blank, back):
+        return [pair for pair in reversed(moves[blank]) if pair[1] != back]
+
+    #(Re)queueing a node under its current f, stale heap entries are skipped by version
+    def enqueue(node):
+        node.version += 1
+        node.queued = True
+        heapq.heappush(best, (node.f, -node.g, next(entries), node.version, node))
+        if not node.children:
+            heapq.heappush(worst, (-node.f, node.g, next(entries), node.version, node))
+
+    def first(heap, leaf):
+        while heap:
+            _, _, _, version, node = heap[0]
+            if node.queued and node.version == version and not (leaf and (node.children or node.parent is None)):
+                return node
+            heapq.heappop(heap)
+        return None
+
+    def back_up(node):
+        while node is not None and not node.pending:
+            f = min(min((child.f for child in node.children.values()), default=math.inf),
+                    min(node.forgotten.values(), default=math.inf))
+            if f == node.f:
+                return
+            node.f = f
+            if node.queued:
+                enqueue(node)
+            node = node.parent
+
+    blank_row, blank_col = find_blank_tile(problem['initial_state'], size)
+    root_h = heuristic['evaluate'](problem['initial_state'])
+    root = BoundedNode(problem['initial_state'], blank_row * size + blank_col, None, -1, 0, root_h, root_h,
+                       successors(blank_row * size + blank_col, -1))
+    enqueue(root)
+    used = peak = 1
+    nodes_expanded = 0
+    budget = problem['budget']
+    check_at = next_check(budget, 0)
+    node_bytes = sum(sys.getsizeof(part) for part in (root, root.children, root.forgotten, root.pending))
+    while True:
+        node = first(best, False)
+        if node is None or node.f == math.inf:
+            stats['status'], stats['limit'] = 'budget_exceeded', 'max_nodes'
+            return "failure", nodes_expanded, peak
+        if nodes_expanded >= check_at:
+            limit = over_budget(budget, nodes_expanded,
+                                lambda: used * node_bytes + (len(best) + len(worst)) * sys.getsizeof(best[0]))
+            if limit is not None:
+                return stop_search(stats, limit, nodes_expanded, peak)
+            check_at = next_check(budget, nodes_expanded)
+        if node.state == goal_state:
+            path = []
+            while node.parent is not None:
+                path.append(node.move)
+                node = node.parent
+            return make_result(goal_state, size, path[::-1]), nodes_expanded, peak
+        nodes_expanded += 1
+        if node.pending:
+            target, move = node.pending.pop()
+            floor = node.f
+        else:
+            #every successor was generated once, bring back the cheapest forgotten one
+            move = min(node.forgotten, key=node.forgotten.get)
+            floor = max(node.f, node.forgotten.pop(move))
+            target = next(target for target, pair_move in moves[node.blank] if pair_move == move)
+            stats['regenerated'] += 1
+        state, blank = node.state, node.blank
+        tile = (state >> (target * bits)) & mask
+        new_state = state ^ (tile << (target * bits)) ^ (tile << (blank * bits))
+        if table is not None:
+            new_h = node.h - table[tile * cells + target] + table[tile * cells + blank]
+        else:
+            new_h = update(node.h, new_state, tile, target, blank)
+        g = node.g + 1
+        #a node at the deepest level the budget allows can never get children of its own
+        f = math.inf if new_state != goal_state and g + 1 >= max_nodes else max(floor, g + new_h)
+        child = BoundedNode(new_state, target, node, move, g, new_h, f, successors(target, INVERSE_MOVE[move]))
+        node.children[move] = child
+        enqueue(child)
+        used += 1
+        if not node.pending:
+            if not node.forgotten:
+                node.queued = False
+            back_up(node)
+        while used > max_nodes:
+            leaf = first(worst, True)
+            heapq.heappop(worst)
+            leaf.queued = False
+            parent = leaf.parent
+            del parent.children[leaf.move]
+            parent.forgotten[leaf.move] = leaf.f
+            if not parent.queued or not parent.children:
+                enqueue(parent)
+            used -= 1
+            stats['pruned'] += 1
+        peak = max(peak, used)
+
+#Bidirectional UCS: with unit move costs UCS is breadth first, so each side grows in whole layers,
+#always on the side with the smaller frontier. Every state within a side's current depth is known
+#to that side, so the first layer that meets the other side holds a shortest path; the cheapest
+#meeting in that layer is taken and the two half paths are spliced together.
+#problem['budget'] is checked as in general_search.
+def bidirectional_search(problem, size, stats=None):
+    cells = size * size
+    bits = tile_bits(size)
+    mask = (1 << bits) - 1
+    moves = move_table(size)
+    blank_row, blank_col = find_blank_tile(problem['initial_state'], size)
+    sides = []
+    for state, blank in ((problem['initial_state'], blank_row * size + blank_col), (problem['goal_state'], cells - 1)):
+        store = NodeStore(size)
+        root = make_node(store, state, blank)
+        sides.append({'store': store, 'seen': {state: root}, 'layer': [root]})
+    forward, backward = sides
+    if problem['initial_state'] == problem['goal_state']:
+        return make_result(problem['goal_state'], size, []), 0, 1
+    nodes_expanded = 0
+    max_queue_size = 2
+    budget = problem['budget']
+    check_at = next_check(budget, 0)
+    stats = stats if stats is not None else {}
+    while forward['layer'] and backward['layer']:
+        side, other = (forward, backward) if len(forward['layer']) <= len(backward['layer']) else (backward, forward)
+        store, seen, other_seen = side['store'], side['seen'], other['seen']
+        best = None
+        layer = []
+        for node in side['layer']:
+            state, blank, cost = store.states[node], store.blank[node], store.cost[node] + 1
+            if nodes_expanded >= check_at:
+                limit = over_budget(budget, nodes_expanded, lambda: sum(
+                    tracked_bytes(both['store'], both['seen'], (), both['layer']) for both in sides) + 8 * len(layer))
+                if limit is not None:
+                    return stop_search(stats, limit, nodes_expanded, max_queue_size)
+                check_at = next_check(budget, nodes_expanded)
+            nodes_expanded += 1
+            for target, move in moves[blank]:
+                tile = (state >> (target * bits)) & mask
+                new_state = state ^ (tile << (target * bits)) ^ (tile << (blank * bits))
+                if new_state in seen:
+                    continue
+                child = make_node(store, new_state, target, node, cost, move)
+                seen[new_state] = child
+                layer.append(child)
+                if new_state in other_seen:
+                    total = cost + other['store'].cost[other_seen[new_state]]
+                    if best is None or total < best[0]:
+                        best = (total, new_state)
+        side['layer'] = layer
+        max_queue_size = max(max_queue_size, len(forward['layer']) + len(backward['layer']))
+        if best is not None:
+            meeting = best[1]
+            return make_result(problem['goal_state'], size,
+                               half_path(forward, meeting) + [INVERSE_MOVE[move]
+                                                              for move in reversed(half_path(backward, meeting))]), \
+                nodes_expanded, max_queue_size
+    return "failure", nodes_expanded, max_queue_size
+
+#Moves from a side's root to one of its states
+def half_path(side, state):
+    return path_moves(side['store'], side['seen'][state])
+
+#Defaults of the bounded-suboptimal searches: the weight on h, how much the anytime search lowers
+#it after every solution, and how many nodes a beam keeps per layer
+DEFAULT_WEIGHT = 2.0
+WEIGHT_STEP = 0.5
+BEAM_WIDTH = 1000
+#Proven suboptimality bound of a solution: optimal cost is at least the lower bound. Rounded up to
+#three decimals so the rounded bound still holds
+def suboptimality(cost, lower_bound):
+    return math.ceil(cost * 1000 / lower_bound) / 1000 if lower_bound and cost > lower_bound else 1.0
+
+#Anytime repairing A* (ARA*): weighted A* on g + w*h that is repeated with a smaller w after every
+#solution, reusing its work. A state whose g improves after it was expanded in the current round
+#waits in 'incons' for the next round instead of being expanded again. Every round's solution is
+#at most min(w, cost / lowest g + h still open) times optimal. With final_weight equal to weight
+#it is plain weighted A*. time_limit, or any limit of problem['budget'], stops it with the best
+#solution so far. stats['solutions'] lists (w, cost, bound, seconds) for every solution found.
+def anytime_search(problem, size, weight=DEFAULT_WEIGHT, final_weight=1.0, time_limit=None, stats=None):
+    cells = size * size
+    bits = tile_bits(size)
+    mask = (1 << bits) - 1
+    heuristic = problem['heuristic'] if problem['heuristic'] is not None else \
+        make_table_heuristic((0,) * (cells * cells), size)
+    table = heuristic['table']
+    update = heuristic['update']
+    moves = move_table(size)
+    goal_state = problem['goal_state']
+    started = time.perf_counter()
+    budget = timed_budget(problem['budget'], time_limit)
+    check_at = next_check(budget, 0)
+    limit = None
+    store = NodeStore(size)
+    root = problem['initial_state']
+    root_h = heuristic['evaluate'](root)
+    blank_row, blank_col = find_blank_tile(root, size)
+    root_node = make_node(store, root, blank_row * size + blank_col, h=root_h)
+    best_node = {root: root_node}
+    open_nodes = {root: root_node}
+    incons = {}
+    closed = make_visited(size, bits, problem['visited'])
+    goal_node = root_node if root == goal_state else None
+    solutions = []
+    nodes_expanded = 0
+    max_queue_size = 1
+
+    def queued(w):
+        heap = [(store.cost[node] + w * store.h[node], -store.cost[node], node) for node in open_nodes.values()]
+        heapq.heapify(heap)
+        return heap
+
+    #One round of weighted A*; False when it hit a limit first
+    def improve_path(w, heap):
+        nonlocal goal_node, nodes_expanded, max_queue_size, check_at, limit
+        while heap:
+            key, _, node = heap[0]
+            state = store.states[node]
+            if open_nodes.get(state) != node:
+                heapq.heappop(heap)
+                continue
+            if goal_node is not None and key >= store.cost[goal_node]:
+                return True
+            if nodes_expanded >= check_at:
+                limit = over_budget(budget, nodes_expanded, lambda: tracked_bytes(store, best_node, closed, heap))
+                if limit is not None:
+                    return False
+                check_at = next_check(budget, nodes_expanded)
+            heapq.heappop(heap)
+            del open_nodes[state]
+            closed.add(state)
+            nodes_expanded += 1
+            blank, cost, h = store.blank[node], store.cost[node] + 1, store.h[node]
+            for target, move in moves[blank]:
+                tile = (state >> (target * bits)) & mask
+                new_state = state ^ (tile << (target * bits)) ^ (tile << (blank * bits))
+                old = best_node.get(new_state)
+                if old is not None and store.cost[old] <= cost:
+                    continue
+                if table is not None:
+                    new_h = h - table[tile * cells + target] + table[tile * cells + blank]
+                else:
+                    new_h = update(h, new_state, tile, target, blank)
+                child = best_node[new_state] = make_node(store, new_state, target, node, cost, move, new_h)
+                if new_state == goal_state:
+                    goal_node = child
+                if new_state in closed:
+                    incons[new_state] = child
+                else:
+                    open_nodes[new_state] = child
+                    heapq.heappush(heap, (cost + w * new_h, -cost, child))
+            max_queue_size = max(max_queue_size, len(open_nodes) + len(incons))
+        return True
+
+    w = max(weight, final_weight)
+    while True:
+        finished = improve_path(w, queued(w))
+        if goal_node is not None and (not solutions or store.cost[goal_node] < solutions[-1][1]):
+            lower_bound = min([store.cost[node] + store.h[node] for waiting in (open_nodes, incons)
+                               for node in waiting.values()] + [store.cost[goal_node]])
+            bound = max(1.0, min(w, suboptimality(store.cost[goal_node], max(lower_bound, root_h))))
+            solutions.append((w, store.cost[goal_node], bound, round(time.perf_counter() - started, 6)))
+        if not finished or w <= final_weight or (solutions and solutions[-1][2] <= 1):
+            break
+        w = max(final_weight, w - WEIGHT_STEP)
+        open_nodes.update(incons)
+        incons.clear()
+        closed.clear()
+    stats = stats if stats is not None else {}
+    stats['solutions'] = solutions
+    if goal_node is None:
+        if not finished:
+            return stop_search(stats, limit, nodes_expanded, max_queue_size)
+        stats['status'] = 'unsolvable'
+        return "failure", nodes_expanded, max_queue_size
+    result = make_solution(store, goal_node)
+    result['bound'] = solutions[-1][2]
+    return result, nodes_expanded, max_queue_size
+
+#Beam search: breadth first, but only the width children with the lowest h of every layer are
+#kept, so memory stays at width nodes a layer. It is incomplete and its first solution is the
+#answer; optimal cost is at least h of the initial state, which gives the reported bound.
+#time_limit, or any limit of problem['budget'], stops it without an answer.
+def beam_search(problem, size, width=BEAM_WIDTH, time_limit=None, stats=None):
+    cells = size * size
+    bits = tile_bits(size)
+    mask = (1 << bits) - 1
+    heuristic = problem['heuristic'] if problem['heuristic'] is not None else \
+        make_table_heuristic((0,) * (cells * cells), size)
+    table = heuristic['table']
+    update = heuristic['update']
+    moves = move_table(size)
+    goal_state = problem['goal_state']
+    budget = timed_budget(problem['budget'], time_limit)
+    check_at = next_check(budget, 0)
+    limit = None
+    stats = stats if stats is not None else {}
+    store = NodeStore(size)
+    root = problem['initial_state']
+    root_h = heuristic['evaluate'](root)
+    blank_row, blank_col = find_blank_tile(root, size)
+    layer = [make_node(store, root, blank_row * size + blank_col, h=root_h)]
+    seen = make_visited(size, bits, problem['visited'])
+    seen.add(root)
+    nodes_expanded = 0
+    max_queue_size = 1
+    goal_node = layer[0] if root == goal_state else None
+    while layer and goal_node is None and limit is None:
+        children = []
+        for node in layer:
+            if nodes_expanded >= check_at:
+                limit = over_budget(budget, nodes_expanded,
+                                    lambda: tracked_bytes(store, {}, seen, layer) + 8 * len(children))
+                if limit is not None:
+                    break
+                check_at = next_check(budget, nodes_expanded)
+            state, blank, cost, h = store.states[node], store.blank[node], store.cost[node] + 1, store.h[node]
+            nodes_expanded += 1
+            for target, move in moves[blank]:
+                tile = (state >> (target * bits)) & mask
+                new_state = state ^ (tile << (target * bits)) ^ (tile << (blank * bits))
+                if new_state in seen:
+                    continue
+                seen.add(new_state)
+                if table is not None:
+                    new_h = h - table[tile * cells + target] + table[tile * cells + blank]
+                else:
+                    new_h = update(h, new_state, tile, target, blank)
+                child = make_node(store, new_state, target, node, cost, move, new_h)
+                if new_state == goal_state:
+                    goal_node = child
+                children.append(child)
+        max_queue_size = max(max_queue_size, len(children))
+        layer = heapq.nsmallest(width, children, key=store.h.__getitem__)
+    if goal_node is None:
+        if limit is not None:
+            return stop_search(stats, limit, nodes_expanded, max_queue_size)
+        stats['status'] = 'not_found'
+        return "failure", nodes_expanded, max_queue_size
+    result = make_solution(store, goal_node)
+    result['bound'] = suboptimality(result['cost'], root_h)
+    return result, nodes_expanded, max_queue_size
+
+#The exact 3x3 distance table lives in distance_table.py and is memory-mapped once per process
+@lru_cache(maxsize=None)
+def exact_distance_table():
+    from distance_table import load_distance_table
+    return load_distance_table()
+
+#Optimal 3x3 answers straight from the distance table: the depth is one lookup and the moves
+#come from greedy descent, so nodes expanded is the number of steps walked
+def lookup_search(problem, size):
+    if size != 3:
+        raise ValueError("The exact distance table only covers 3x3 boards.")
+    from distance_table import lookup_moves
+    blank_row, blank_col = find_blank_tile(problem['initial_state'], size)
+    moves = lookup_moves(exact_distance_table(), problem['initial_state'], blank_row * size + blank_col)
+    return make_result(problem['goal_state'], size, moves), len(moves), 1
+
+#Menu choice -> (label, search method, heuristic for a board size)
+SEARCH_CHOICES = {
+    1: ('UCS', 'graph', None),
+    2: ('A* Misplaced Tile', 'graph', misplaced_tiles_heuristic),
+    3: ('A* Manhattan Distance', 'graph', manhattan_distance_heuristic),
+    4: ('IDA* Manhattan Distance', 'ida', manhattan_distance_heuristic),
+    5: ('A* Pattern Database', 'graph', pattern_database_heuristic),
+    6: ('A* Linear Conflict', 'graph', linear_conflict_heuristic),
+    7: ('A* Walking Distance', 'graph', walking_distance_heuristic),
+    8: ('Exact Distance Table (3x3 only)', 'table', None),
+    9: ('Bidirectional UCS', 'bidirectional', None),
+    10: ('SMA* Manhattan Distance (memory-bounded)', 'bounded', manhattan_distance_heuristic),
+    11: ('Weighted A* Linear Conflict', 'weighted', linear_conflict_heuristic),
+    12: ('Anytime Weighted A* Linear Conflict (ARA*)', 'anytime', linear_conflict_heuristic),
+    13: ('Beam Search Linear Conflict', 'beam', linear_conflict_heuristic),
+}
+
+#Building the problem for a packed initial state and a menu choice, a choice that does not
+#support the board size raises ValueError
+#max_nodes is the node budget of the memory-bounded search, other methods ignore it
+#cache is an optional cache.TranspositionCache shared between searches
+#weight, beam_width and time_limit (seconds, None for no limit) are for the suboptimal searches
+#budget is an optional make_budget for the searches
+#visited is the kind of closed and seen set (see visited.make_visited), 'set' or 'bitset'
+#frontier is the open list of the graph searches (see frontier.py), 'bucket' or 'heap'
+def make_problem(initial_state, size, choice, max_nodes=NODE_BUDGET, cache=None, weight=DEFAULT_WEIGHT,
+                 beam_width=BEAM_WIDTH, time_limit=None, budget=None, visited='set', frontier='bucket'):
+    label, method, heuristic = SEARCH_CHOICES[choice]
+    if frontier not in FRONTIERS:
+        raise ValueError(f"Unknown frontier '{frontier}'. Choose from: {', '.join(FRONTIERS)}")
+    if method == 'table' and size != 3:
+        raise ValueError("The exact distance table only covers 3x3 boards.")
+    if method == 'bounded' and max_nodes < 2:
+        raise ValueError("The memory-bounded search needs a node budget of at least 2.")
+    if method in ('weighted', 'anytime') and not weight >= 1:
+        raise ValueError("The weight on h must be at least 1.")
+    goal_state = make_goal_state(size)
+    return {
+        'initial_state': initial_state,
+        'goal_state': goal_state,
+        'goal_test': lambda state: state == goal_state,
+        'heuristic': heuristic(size) if heuristic is not None else None,
+        'method': method,
+        'max_nodes': max_nodes,
+        'cache': cache,
+        'weight': weight,
+        'beam_width': beam_width,
+        'time_limit': time_limit,
+        'budget': budget,
+        'visited': visited,
+        'frontier': frontier,
+        'operators': []
+    }
+
+#Unsolvable boards fail before any search. With a transposition cache, cached boards are answered
+#without searching and every solved path goes into the cache.
+#stats['status'] ends up 'solved', 'unsolvable', 'budget_exceeded' (stats['limit'] says which),
+#'cancelled', or 'not_found' for an incomplete search that gave up.
+def search(problem, size, stats=None, observer=None):
+    stats = stats if stats is not None else {}
+    stats.pop('status', None)
+    stats.pop('limit', None)
+    if not is_solvable(problem['initial_state'], size):
+        stats['status'] = 'unsolvable'
+        return "failure", 0, 0
+    cache = problem['cache']
+    moves = cache.moves(problem['initial_state'], problem['goal_state'], size) if cache is not None else None
+    if moves is not None:
+        stats['status'] = 'solved'
+        return make_result(problem['goal_state'], size, moves), 0, 0
+    result, nodes_expanded, max_queue_size = run_search(problem, size, stats, observer)
+    stats.setdefault('status', 'unsolvable' if result == "failure" else 'solved')
+    #only proven optimal paths hold exact distances
+    if cache is not None and result != "failure" and result.get('bound', 1.0) <= 1:
+        cache.store_path(problem['initial_state'], problem['goal_state'], size,
+                         [MOVE_LETTERS.index(letter) for letter in result['moves']])
+    return result, nodes_expanded, max_queue_size
+
+#Running the search method the problem was built for
+#The observer only applies to the graph searches that go through general_search
+def run_search(problem, size, stats=None, observer=None):
+    if problem['method'] == 'ida':
+        return ida_star_search(problem, size, stats)
+    if problem['method'] == 'table':
+        return lookup_search(problem, size)
+    if problem['method'] == 'bidirectional':
+        return bidirectional_search(problem, size, stats)
+    if problem['method'] == 'bounded':
+        return sma_star_search(problem, size, stats, problem['max_nodes'])
+    if problem['method'] == 'weighted':
+        return anytime_search(problem, size, problem['weight'], problem['weight'], problem['time_limit'], stats)
+    if problem['method'] == 'anytime':
+        return anytime_search(problem, size, problem['weight'], 1.0, problem['time_limit'], stats)
+    if problem['method'] == 'beam':
+        return beam_search(problem, size, problem['beam_width'], problem['time_limit'], stats)
+    queueing_function = ucs_queueing_function if problem['heuristic'] is None else a_star_heuristic_function
+    return general_search(problem, queueing_function, size, problem['frontier'], stats, observer)
 
 def get_user_input():
     size = int(input("Enter puzzle size: 3 for 3x3, 4 for 4x4, 5 for 5x5: "))
@@ -106,44 +1183,94 @@ def get_user_input():
     for i in range(size):
         row = input(f"Enter row {i + 1}: ")
         initial_state.append(tuple(map(int, row.split())))
-    initial_state = tuple(initial_state)
-    print("Choose the search method: 1 for UCS, 2 for A* Misplaced Tile, 3 for A* Manhattan Distance")
+
+    initial_state = check_board(initial_state, size)
+    print("Choose the search method: " + ", ".join(f"{choice} for {label}"
+                                                    for choice, (label, _, _) in SEARCH_CHOICES.items()))
     choice = int(input("Your choice: "))
     return initial_state, choice, size
 
-def main():
-    initial_state, choice, size = get_user_input()
-    goal_state = [list(range(1 + i * size, 1 + i * size + size)) for i in range(size)]
-    goal_state[-1][-1] = 0
-    goal_state = tuple(tuple(row) for row in goal_state)
-    goal_positions = {n: divmod(idx, size) for idx, n in enumerate(sum(goal_state, ()))}
+#Reading a board given on one line, tiles row by row, the size comes from the tile count
+def parse_board(text):
+    tiles = [int(tile) for tile in text.replace(',', ' ').split()]
+    size = math.isqrt(len(tiles))
+    if size < 2 or size * size != len(tiles):
+        raise ValueError(f"A board needs a square number of tiles, got {len(tiles)}.")
+    return check_board([tiles[row * size:(row + 1) * size] for row in range(size)], size), size
 
-    problem = {
-        'initial_state': initial_state,
-        'goal_test': lambda state: state == goal_state,
-        'operators': []
-    }
+def parse_args():
+    parser = argparse.ArgumentParser(description="Solve an N-puzzle. Prompts for the board when --board is omitted.")
+    parser.add_argument('--board', help="tiles row by row with 0 for the blank, e.g. '1 2 3 4 5 6 7 0 8'")
+    parser.add_argument('--choice', type=int, default=3, choices=sorted(SEARCH_CHOICES),
+                        help=", ".join(f"{choice} for {label}" for choice, (label, _, _) in SEARCH_CHOICES.items()))
+    parser.add_argument('--max-nodes', type=int, default=NODE_BUDGET,
+                        help="node budget of the memory-bounded search, at least 2 and the solution depth + 1 to solve")
+    parser.add_argument('--weight', type=float, default=DEFAULT_WEIGHT,
+                        help="weight on h of the weighted and anytime searches, their first w")
+    parser.add_argument('--beam-width', type=int, default=BEAM_WIDTH, help="nodes kept per layer by beam search")
+    parser.add_argument('--time-limit', type=float,
+                        help="seconds the search may run; the anytime search keeps its best answer")
+    parser.add_argument('--max-expanded', type=int, help="nodes the search may expand")
+    parser.add_argument('--max-memory-mb', type=float, help="memory the search may hold, in MB, as it estimates it")
+    parser.add_argument('--frontier', default='bucket', choices=sorted(FRONTIERS),
+                        help="open list of the graph searches: bucket queue or binary heap")
+    parser.add_argument('--visited', default='set', choices=VISITED_KINDS,
+                        help="closed set of the searches; bitset keeps 3x3 in 23 KB but is slower")
+    parser.add_argument('--profile', action='store_true', help="print time spent in each search phase")
+    return parser.parse_args()
 
-    if choice == 1:
-        queueing_function = lambda nodes, new_nodes, max_q: ucs_queueing_function(nodes, new_nodes, max_q)
-    elif choice == 2:
-        queueing_function = lambda nodes, new_nodes, max_q: a_star_heuristic_function(nodes, new_nodes,
-            lambda state: heuristic_misplaced_tiles(state, goal_state, size), max_q)
-    elif choice == 3:
-        queueing_function = lambda nodes, new_nodes, max_q: a_star_heuristic_function(nodes, new_nodes,
-            lambda state: heuristic_manhattan_distance(state, goal_positions, size), max_q)
-    else:
-        print("Invalid choice")
+def main():
+    args = parse_args()
+    cancel = threading.Event()
+    try:
+        if args.board is not None:
+            initial_state, size = parse_board(args.board)
+            choice = args.choice
+        else:
+            initial_state, choice, size = get_user_input()
+        if choice not in SEARCH_CHOICES:
+            print("Invalid choice")
+            return
+        budget = make_budget(args.max_expanded, args.time_limit, args.max_memory_mb, cancel)
+        problem = make_problem(initial_state, size, choice, args.max_nodes, weight=args.weight,
+                               beam_width=args.beam_width, time_limit=args.time_limit, budget=budget,
+                               visited=args.visited, frontier=args.frontier)
+    except ValueError as error:
+        print(error)
         return
 
-    result, nodes_expanded, max_queue_size = general_search(problem, queueing_function, size)
+    #the first Ctrl-C stops the search at its next budget check, a second one interrupts
+    def cancel_search(signum, frame):
+        cancel.set()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+    signal.signal(signal.SIGINT, cancel_search)
+    stats = {}
+    result, nodes_expanded, max_queue_size = search(problem, size, stats, make_observer() if args.profile else None)
+    for iteration, (bound, nodes) in enumerate(stats.get('iterations', ()), 1):
+        print(f"Iteration {iteration}: f bound {bound}, {nodes} nodes expanded")
+    for weight, cost, bound, seconds in stats.get('solutions', ()):
+        print(f"w {weight}: solution depth {cost}, within {bound} of optimal, after {seconds:.3f}s")
     if result != "failure":
         print("\nSolution found:")
         print(f"Solution depth is {result['cost']}")
+        print(f"Moves of the blank are {result['moves'] or '(none, already solved)'}")
+        if 'bound' in result:
+            print(f"Proven within {result['bound']} times the optimal depth")
         print(f"Number of nodes expanded is {nodes_expanded}")
         print(f"Maximum queue size is {max_queue_size}")
+        if 'duplicates_pruned' in stats:
+            print(f"Duplicates pruned is {stats['duplicates_pruned']}, stale queue entries skipped is "
+                  f"{stats['stale_pops']}, states reopened is {stats['reopened']}")
+        if 'regenerated' in stats:
+            print(f"Leaves pruned is {stats['pruned']}, forgotten children regenerated is {stats['regenerated']}")
+    elif stats['status'] in ('budget_exceeded', 'cancelled'):
+        reason = "Search cancelled" if stats['status'] == 'cancelled' else f"Search stopped at the {stats['limit']} limit"
+        print(f"{reason} after {nodes_expanded} nodes expanded, maximum queue size {max_queue_size}.")
     else:
         print("No solution found.")
+    if 'timers' in stats:
+        print(f"Nodes generated is {stats['generated']}")
+        print("Time spent: " + ", ".join(f"{phase} {seconds:.4f}s" for phase, seconds in stats['timers'].items()))
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,187 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+from collections import deque
+
+from nine import move_table, tile_bits
+
+#File layout: magic, board size, number of groups, then for every group its tile count and tiles,
+#then one byte table per group of cells ** tile count entries
+MAGIC = b'PDB1'
+UNREACHED = 255
+TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tables')
+
+#Disjoint tile groups per board size; every non-blank tile belongs to exactly one group
+DEFAULT_GROUPS = {
+    3: ((1, 2, 3, 4), (5, 6, 7, 8)),
+    4: ((1, 2, 3, 5, 6), (4, 7, 8, 11, 12), (9, 10, 13, 14, 15)),
+    5: ((1, 2, 6, 7), (3, 4, 8, 9), (5, 10, 15, 20), (11, 12, 16, 17), (13, 14, 18, 19), (21, 22, 23, 24)),
+}
+
+def default_path(size):
+    return os.path.join(TABLE_DIR, f'pdb_{size}x{size}.bin')
+
+#Checking that the groups split the tiles 1..n*n-1 without overlap
+def check_groups(size, groups):
+    tiles = [tile for group in groups for tile in group]
+    if sorted(tiles) != list(range(1, size * size)):
+        raise ValueError("Pattern groups must cover every tile 1..n*n-1 exactly once.")
+
+#Index of a pattern placement: the group's tile positions as digits in base cells
+def placement_weights(size, group):
+    cells = size * size
+    return tuple(cells ** (len(group) - 1 - slot) for slot in range(len(group)))
+
+#Backward 0-1 BFS from the goal over (pattern tile positions, blank position)
+#Only moves of the group's own tiles cost 1, which keeps the sum over disjoint groups admissible
+def build_group_table(size, group):
+    cells = size * size
+    moves = move_table(size)
+    weights = placement_weights(size, group)
+    goal_index = sum((tile - 1) * weight for tile, weight in zip(group, weights))
+    entries = cells ** len(group)
+    table = bytearray([UNREACHED]) * entries
+    distance = bytearray([UNREACHED]) * (entries * cells)
+    start = goal_index * cells + cells - 1
+    distance[start] = 0
+    table[goal_index] = 0
+    queue = deque([start])
+    while queue:
+        code = queue.popleft()
+        d = distance[code]
+        index, blank = divmod(code, cells)
+        slot_at = {}
+        rest = index
+        for slot, weight in enumerate(weights):
+            position, rest = divmod(rest, weight)
+            slot_at[position] = slot
+        for target, _ in moves[blank]:
+            slot = slot_at.get(target)
+            if slot is None:
+                new_code, new_d = index * cells + target, d
+            else:
+                new_index = index + (blank - target) * weights[slot]
+                new_code, new_d = new_index * cells + target, d + 1
+            if new_d < distance[new_code]:
+                distance[new_code] = new_d
+                if new_d == d:
+                    queue.appendleft(new_code)
+                else:
+                    queue.append(new_code)
+                    if new_d < table[new_code // cells]:
+                        table[new_code // cells] = new_d
+    return table
+
+#One group's table, from the NumPy layer sweep in sweep.py when NumPy is installed
+def group_table(size, group):
+    from vector import np
+    if np is None:
+        return build_group_table(size, group)
+    from sweep import sweep_group
+    return sweep_group(size, group).tobytes()
+
+#Building every group's table and writing them to one file
+def build_pattern_database(size, groups=None, path=None):
+    groups = tuple(tuple(group) for group in (groups or DEFAULT_GROUPS[size]))
+    check_groups(size, groups)
+    path = path or default_path(size)
+    header = MAGIC + struct.pack('<BB', size, len(groups))
+    for group in groups:
+        header += struct.pack(f'<B{len(group)}B', len(group), *group)
+    tables = [group_table(size, group) for group in groups]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + '.tmp', 'wb') as file:
+        file.write(header)
+        for table in tables:
+            file.write(table)
+    os.replace(path + '.tmp', path)
+    return path
+
+#Memory-mapping a table file, pages are shared between processes mapping the same file
+def load_pattern_database(path):
+    with open(path, 'rb') as file:
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if data[:4] != MAGIC:
+        raise ValueError(f"{path} is not a pattern database file.")
+    size, group_count = data[4], data[5]
+    offset = 6
+    groups = []
+    for _ in range(group_count):
+        length = data[offset]
+        groups.append(tuple(data[offset + 1:offset + 1 + length]))
+        offset += 1 + length
+    view = memoryview(data)
+    tables = []
+    for group in groups:
+        entries = (size * size) ** len(group)
+        tables.append(view[offset:offset + entries])
+        offset += entries
+    return {'size': size, 'groups': tuple(groups), 'tables': tables, 'mmap': data}
+
+#Heuristic dict for nine.py: sum of the group tables, and a move only changes the moved tile's group
+def make_heuristic(database):
+    size = database['size']
+    cells = size * size
+    bits = tile_bits(size)
+    mask = (1 << bits) - 1
+    groups = database['groups']
+    tables = database['tables']
+    weights = [placement_weights(size, group) for group in groups]
+    group_of = {}
+    for number, group in enumerate(groups):
+        for slot, tile in enumerate(group):
+            group_of[tile] = (number, slot)
+
+    def positions(state):
+        where = [0] * cells
+        for index in range(cells):
+            where[(state >> (index * bits)) & mask] = index
+        return where
+
+    def group_index(where, number):
+        return sum(where[tile] * weight for tile, weight in zip(groups[number], weights[number]))
+
+    def evaluate(state):
+        where = positions(state)
+        return sum(tables[number][group_index(where, number)] for number in range(len(groups)))
+
+    def update(h, state, tile, from_cell, to_cell):
+        number, slot = group_of[tile]
+        new_index = group_index(positions(state), number)
+        old_index = new_index - (to_cell - from_cell) * weights[number][slot]
+        table = tables[number]
+        return h - table[old_index] + table[new_index]
+
+    return {'table': None, 'evaluate': evaluate, 'update': update, 'database': database}
+
+#Loading the table file for a board size, building it first if it does not exist yet
+def load_heuristic(size, path=None):
+    path = path or default_path(size)
+    if not os.path.exists(path):
+        if size not in DEFAULT_GROUPS:
+            raise ValueError(f"Pattern databases have default groups for {min(DEFAULT_GROUPS)}x{min(DEFAULT_GROUPS)} "
+                             f"to {max(DEFAULT_GROUPS)}x{max(DEFAULT_GROUPS)} boards only.")
+        print(f"Building pattern database for {size}x{size}, this runs once...", file=sys.stderr)
+        build_pattern_database(size, path=path)
+    database = load_pattern_database(path)
+    if database['size'] != size:
+        raise ValueError(f"{path} holds a {database['size']}x{database['size']} database, not {size}x{size}.")
+    return make_heuristic(database)
+
+#Groups on the command line look like 1,2,3,5,6/4,7,8,11,12/9,10,13,14,15
+def parse_groups(text):
+    return tuple(tuple(int(tile) for tile in group.split(',')) for group in text.split('/'))
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an additive pattern database table file.")
+    parser.add_argument('size', type=int, help="board size, 3 for 3x3, 4 for 4x4, 5 for 5x5")
+    parser.add_argument('--groups', type=parse_groups, help="disjoint tile groups, e.g. 1,2,3,4/5,6,7,8")
+    parser.add_argument('--output', help="table file to write")
+    args = parser.parse_args()
+    path = build_pattern_database(args.size, args.groups, args.output)
+    print(f"Wrote {path} for groups {load_pattern_database(path)['groups']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from batch import init_worker, solve_item
+from nine import SEARCH_CHOICES, exact_distance_table, make_goal_state, make_problem
+
+DEFAULT_SOCKET = '/tmp/nine.sock'
+#Extra seconds the front end waits past a deadline for the worker's own timeout to answer
+GRACE = 1.0
+
+#Building or memory-mapping every heuristic and table the served choices use. The server runs it
+#before starting the workers, so table files are written once and the workers only map them.
+def load_tables(sizes, choices):
+    for size in sizes:
+        for choice in choices:
+            try:
+                problem = make_problem(make_goal_state(size), size, choice)
+                if problem['method'] == 'table' and size == 3:
+                    exact_distance_table()
+            except ValueError:
+                pass
+
+#Worker start-up: Ctrl-C is left to the server, and tables are loaded before the first request
+def warm_worker(sizes, choices):
+    init_worker()
+    load_tables(sizes, choices)
+
+#Solving in a worker with whatever is left of the request's deadline; a request that waited in the
+#queue past it is answered without starting the search. Less than a millisecond left counts as
+#passed, since it would round to a timeout of 0, which solve_item reads as no timeout at all.
+def solve_before(item, choice, deadline, cache_size):
+    remaining = deadline - time.time()
+    if remaining < 0.001:
+        return {'index': item[0], 'board': item[1], 'status': 'budget_exceeded',
+                'error': "Deadline passed before the solve started."}
+    return solve_item(item, choice, round(remaining, 3), cache_size)
+
+#One request line: {"id": .., "board": "..", "choice": 3, "timeout": 10}, or {"cancel": id} to drop a
+#request of the same connection. Answers carry the request's id and may come back out of order.
+#A cancelled request is answered at once; if its solve already started, the worker still runs it
+#until it finishes or its own deadline stops it.
+async def serve_request(request, pool, args, send):
+    request_id = request.get('id')
+    choice = request.get('choice', args.choice)
+    try:
+        timeout = min(float(request.get('timeout', args.timeout)), args.timeout)
+    except (TypeError, ValueError):
+        await send({'id': request_id, 'error': "The timeout must be a number of seconds."})
+        return
+    if not isinstance(choice, int) or choice not in SEARCH_CHOICES:
+        await send({'id': request_id, 'error': f"Unknown choice {choice}."})
+        return
+    deadline = time.time() + timeout
+    task = partial(solve_before, (request_id, str(request.get('board', ''))), choice, deadline, args.cache_size)
+    try:
+        record = await asyncio.wait_for(asyncio.get_running_loop().run_in_executor(pool, task), timeout + GRACE)
+    except asyncio.TimeoutError:
+        record = {'index': request_id, 'status': 'budget_exceeded', 'error': f"Timed out after {timeout} seconds."}
+    #whatever the worker raised still gets the request an answer, a client waits for one per request
+    except Exception as error:
+        record = {'index': request_id, 'error': str(error) or type(error).__name__}
+    record['id'] = record.pop('index', request_id)
+    await send(record)
+
+#Ids are echoed back as given, so only JSON scalars are taken; a list or object id could not be
+#matched by a cancel
+def valid_id(request_id):
+    return request_id is None or isinstance(request_id, (str, int, float))
+
+#Reading request lines until the client closes its side, then finishing what it asked for. Running
+#requests are kept by task, with the client's id next to it: ids may repeat or be missing.
+async def serve_connection(reader, writer, pool, args):
+    lock = asyncio.Lock()
+    pending = {}
+
+    async def send(record):
+        async with lock:
+            if writer.is_closing():
+                return
+            writer.write((json.dumps(record) + '\n').encode())
+            await writer.drain()
+
+    try:
+        while line := await reader.readline():
+            try:
+                request = json.loads(line)
+            except ValueError:
+                request = None
+            if not isinstance(request, dict):
+                await send({'id': None, 'error': "Requests are one JSON object per line."})
+                continue
+            request_id = request.get('cancel', request.get('id'))
+            if not valid_id(request_id):
+                await send({'id': None, 'error': "Ids must be a string, a number or null."})
+                continue
+            if 'cancel' in request:
+                for task in [task for task, task_id in pending.items() if task_id == request_id]:
+                    del pending[task]
+                    task.cancel()
+                    await send({'id': request_id, 'status': 'cancelled', 'error': "Cancelled."})
+                continue
+            task = asyncio.create_task(serve_request(request, pool, args, send))
+            pending[task] = request_id
+            task.add_done_callback(lambda task: pending.pop(task, None))
+        await asyncio.gather(*pending, return_exceptions=True)
+    except ConnectionError:
+        for task in pending:
+            task.cancel()
+    finally:
+        writer.close()
+
+async def run_server(args):
+    choices = [int(choice) for choice in args.warm_choices.split(',')] if args.warm_choices else [args.choice]
+    sizes = [int(size) for size in args.warm_sizes.split(',')]
+    load_tables(sizes, choices)
+    pool = ProcessPoolExecutor(args.workers, initializer=warm_worker, initargs=(sizes, choices))
+    #starting every worker now, so the first requests do not wait for the warm-up
+    for future in [pool.submit(time.sleep, 0) for _ in range(args.workers)]:
+        future.result()
+    if os.path.exists(args.socket):
+        os.unlink(args.socket)
+    server = await asyncio.start_unix_server(partial(serve_connection, pool=pool, args=args), path=args.socket)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    print(f"Serving on {args.socket} with {args.workers} workers", file=sys.stderr)
+    async with server:
+        await stop.wait()
+    pool.shutdown(wait=False, cancel_futures=True)
+    os.unlink(args.socket)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Solve boards sent as JSON lines over a Unix socket.")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help="Unix socket path to listen on")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="solver processes")
+    parser.add_argument('--choice', type=int, default=3, choices=sorted(SEARCH_CHOICES),
+                        help="search choice of requests that do not name one")
+    parser.add_argument('--timeout', type=float, default=30, help="longest deadline a request may ask for, seconds")
+    parser.add_argument('--cache-size', type=int, default=0,
+                        help="states kept in each worker's transposition cache, 0 turns it off")
+    parser.add_argument('--warm-sizes', default='3,4', help="board sizes whose tables are loaded at start")
+    parser.add_argument('--warm-choices', help="choices whose tables are loaded at start, default --choice")
+    return parser.parse_args()
+
+def main():
+    asyncio.run(run_server(parse_args()))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+import argparse
+import random
+import sys
+import time
+
+from distance_table import UNREACHED, rank_state, state_count
+from nine import DIRECTIONS, apply_moves, make_goal_state, make_problem, move_table, search, tile_bits
+from pattern_database import DEFAULT_GROUPS, check_groups, parse_groups, placement_weights
+from vector import np, require_numpy, stack_states
+
+#Lehmer rank of many boards at once, equal to distance_table.rank_state for every row of tiles
+def rank_tiles(tiles, size):
+    cells = size * size
+    positions = np.argsort(tiles, axis=1)[:, :cells - 2]
+    earlier = np.tri(cells - 2, k=-1, dtype=bool)
+    digits = positions - ((positions[:, None, :] < positions[:, :, None]) & earlier).sum(axis=2)
+    weights = np.ones(cells - 2, dtype=np.int64)
+    for tile in range(cells - 4, -1, -1):
+        weights[tile] = weights[tile + 1] * (cells - tile - 1)
+    return digits @ weights
+
+#Sorted distinct values; sorting and comparing neighbours is much faster than np.unique's hashing
+def distinct(values):
+    values = np.sort(values)
+    return values[np.concatenate(([True], values[1:] != values[:-1]))] if len(values) else values
+
+#Index of one occurrence of every distinct value, found the same way
+def distinct_index(values):
+    order = np.argsort(values)
+    ordered = values[order]
+    return order[np.concatenate(([True], ordered[1:] != ordered[:-1]))] if len(values) else order
+
+#Packed visited bits of a sweep, one per code, so a space of n codes costs n / 8 bytes
+def unvisited(bits, codes):
+    return (bits[codes >> 3] >> (codes & 7)) & 1 == 0
+
+#Setting the bits of sorted, distinct codes; codes sharing a byte are or-ed together first
+def mark(bits, codes):
+    if not len(codes):
+        return
+    index = codes >> 3
+    starts = np.flatnonzero(np.concatenate(([True], index[1:] != index[:-1])))
+    bits[index[starts]] |= np.bitwise_or.reduceat(np.left_shift(1, codes & 7).astype(np.uint8), starts)
+
+#Every child of a layer of boards: for each direction the blanks that can move that way swap
+#with their neighbour, as one fancy-indexed assignment per direction
+def layer_children(tiles, blanks, size):
+    rows = np.arange(len(tiles))
+    children, child_blanks = [], []
+    for dr, dc in DIRECTIONS.values():
+        row, col = blanks // size + dr, blanks % size + dc
+        can = (row >= 0) & (row < size) & (col >= 0) & (col < size)
+        targets = (row * size + col)[can]
+        moved = tiles[can]
+        picked = rows[:len(moved)]
+        moved[picked, blanks[can]] = moved[picked, targets]
+        moved[picked, targets] = 0
+        children.append(moved)
+        child_blanks.append(targets)
+    return np.concatenate(children), np.concatenate(child_blanks)
+
+#Breadth first sweep of every solvable board, a layer at a time. The distance array, indexed by
+#rank, is the visited set as well: a child is new while its entry is still UNREACHED.
+def sweep_ranked(size=3):
+    require_numpy()
+    distance = np.full(state_count(size), UNREACHED, dtype=np.uint8)
+    tiles = stack_states([make_goal_state(size)], size).astype(np.uint8)
+    blanks = np.array([size * size - 1])
+    distance[rank_tiles(tiles, size)] = 0
+    depth = 0
+    while len(tiles):
+        depth += 1
+        children, child_blanks = layer_children(tiles, blanks, size)
+        ranks = rank_tiles(children, size)
+        new = np.flatnonzero(distance[ranks] == UNREACHED)
+        first = new[distinct_index(ranks[new])]
+        distance[ranks[first]] = depth
+        tiles, blanks = children[first], child_blanks[first]
+    return distance
+
+#Children of (placement index, blank) codes in a pattern space: a move onto a pattern tile moves
+#that tile and costs 1, any other move only moves the blank and is free. weight_at holds, per code
+#and cell, the placement weight of the pattern tile on that cell or 0 for a cell without one.
+def group_children(codes, size, weights):
+    cells = size * size
+    index, blank = codes // cells, codes % cells
+    rows = np.arange(len(codes))
+    weight_at = np.zeros((len(codes), cells), dtype=np.int64)
+    for weight in weights:
+        weight_at[rows, (index // weight) % cells] = weight
+    free, paid = [], []
+    for dr, dc in DIRECTIONS.values():
+        row, col = blank // size + dr, blank % size + dc
+        can = (row >= 0) & (row < size) & (col >= 0) & (col < size)
+        target = row * size + col
+        weight = np.where(can, weight_at[rows, np.where(can, target, 0)], 0)
+        on_tile = weight > 0
+        free.append((index * cells + target)[can & ~on_tile])
+        paid.append(((index + (blank - target) * weight) * cells + target)[on_tile])
+    return np.concatenate(free), np.concatenate(paid)
+
+#0-1 breadth first sweep of one pattern group's abstract space, the same table as
+#pattern_database.build_group_table: the free moves of a layer are closed over before the paid
+#ones open the next layer, and a placement's entry is its cheapest distance over every blank.
+#Layers come in order of distance, so a code's first visit is its distance and the visited set
+#only needs a bit per (placement, blank) code; a placement takes the depth it is first reached at.
+def sweep_group(size, group):
+    require_numpy()
+    cells = size * size
+    weights = placement_weights(size, group)
+    entries = cells ** len(group)
+    table = np.full(entries, UNREACHED, dtype=np.uint8)
+    visited = np.zeros((entries * cells + 7) // 8, dtype=np.uint8)
+    goal_index = sum((tile - 1) * weight for tile, weight in zip(group, weights))
+    layer = np.array([goal_index * cells + cells - 1], dtype=np.int64)
+    mark(visited, layer)
+    depth = 0
+    while len(layer):
+        frontier = layer
+        paid = []
+        while len(frontier):
+            placements = frontier // cells
+            table[placements[table[placements] == UNREACHED]] = depth
+            free, next_paid = group_children(frontier, size, weights)
+            paid.append(next_paid)
+            frontier = distinct(free[unvisited(visited, free)])
+            mark(visited, frontier)
+        depth += 1
+        layer = np.concatenate(paid)
+        layer = distinct(layer[unvisited(visited, layer)])
+        mark(visited, layer)
+    return table
+
+#Boards per depth, ignoring entries that were never reached
+def depth_histogram(distance):
+    counts = np.bincount(np.asarray(distance)[np.asarray(distance) != UNREACHED])
+    return counts.tolist()
+
+#Checking general_search answers against a sweep: every returned move string has to reach the
+#goal in exactly the swept distance. Returns (board, expected, result) for every mismatch.
+def validate(distance, boards, choice, size=3):
+    mismatches = []
+    for state in boards:
+        result, _, _ = search(make_problem(state, size, choice), size)
+        expected = int(distance[rank_state(state, size)])
+        if result == "failure" or result['cost'] != expected or \
+                apply_moves(state, size, result['moves']) != make_goal_state(size):
+            mismatches.append((state, expected, result))
+    return mismatches
+
+#Seeded solvable boards by random walks from the goal
+def random_boards(size, count, seed):
+    rng = random.Random(seed)
+    bits = tile_bits(size)
+    mask = (1 << bits) - 1
+    moves = move_table(size)
+    boards = []
+    for _ in range(count):
+        state, blank = make_goal_state(size), size * size - 1
+        for _ in range(rng.randrange(200)):
+            target, _ = rng.choice(moves[blank])
+            tile = (state >> (target * bits)) & mask
+            state ^= (tile << (target * bits)) ^ (tile << (blank * bits))
+            blank = target
+        boards.append(state)
+    return boards
+
+def main():
+    parser = argparse.ArgumentParser(description="Breadth first sweeps of whole state spaces with NumPy.")
+    parser.add_argument('space', choices=('ranked', 'pdb'), help="ranked 3x3 boards, or a pattern database's groups")
+    parser.add_argument('--size', type=int, default=3, help="board size")
+    parser.add_argument('--groups', type=parse_groups, help="pdb groups, e.g. 1,2,3,4/5,6,7,8")
+    parser.add_argument('--validate', type=int, default=0, help="ranked only: check this many random boards")
+    parser.add_argument('--choice', type=int, default=3, help="search choice the boards are checked with")
+    parser.add_argument('--seed', type=int, default=205, help="seed of the validation boards")
+    args = parser.parse_args()
+    require_numpy()
+    if args.space == 'ranked':
+        started = time.perf_counter()
+        distance = sweep_ranked(args.size)
+        print(f"Swept {len(distance)} boards in {time.perf_counter() - started:.3f}s")
+        print("States per depth: " + " ".join(str(count) for count in depth_histogram(distance)))
+        if args.validate:
+            mismatches = validate(distance, random_boards(args.size, args.validate, args.seed), args.choice,
+                                  args.size)
+            for state, expected, result in mismatches:
+                print(f"Mismatch: {state:#x} needs {expected} moves, search gave "
+                      f"{result if result == 'failure' else result['cost']}")
+            print(f"Validated {args.validate} boards, {len(mismatches)} mismatches")
+            if mismatches:
+                sys.exit(1)
+        return
+    groups = args.groups or DEFAULT_GROUPS[args.size]
+    check_groups(args.size, groups)
+    for group in groups:
+        started = time.perf_counter()
+        table = sweep_group(args.size, group)
+        print(f"Group {group}: {len(table)} placements in {time.perf_counter() - started:.3f}s, "
+              f"per depth: " + " ".join(str(count) for count in depth_histogram(table)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+import argparse
+import json
+import sys
+
+from batch import read_boards
+from nine import line_conflicts, manhattan_distance_table, misplaced_tiles_table, parse_board, tile_bits
+
+#NumPy is optional: nine.py never needs it, only the batched evaluation here does
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def require_numpy():
+    if np is None:
+        raise ImportError("vector.py needs NumPy, install it with: pip install numpy")
+
+#Unpacking packed states into a (states x cells) array of tiles. States wider than 64 bits
+#(5x5 and up) are first split into 64-bit words holding whole tiles.
+def stack_states(states, size):
+    require_numpy()
+    cells = size * size
+    bits = tile_bits(size)
+    per_word = 64 // bits
+    words = -(-cells // per_word)
+    word_mask = (1 << (per_word * bits)) - 1
+    if words == 1:
+        packed = np.array(states, dtype=np.uint64).reshape(-1, 1)
+    else:
+        packed = np.array([[(state >> (word * per_word * bits)) & word_mask for word in range(words)]
+                           for state in states], dtype=np.uint64).reshape(-1, words)
+    cell = np.arange(cells)
+    shifts = ((cell % per_word) * bits).astype(np.uint64)
+    return ((packed[:, cell // per_word] >> shifts) & np.uint64((1 << bits) - 1)).astype(np.intp)
+
+#Sum of a per tile, per position table (indexed tile * cells + position) over every board
+def table_batch(tiles, table, size):
+    cells = size * size
+    return np.asarray(table, dtype=np.int32)[tiles * cells + np.arange(cells)].sum(axis=1)
+
+def misplaced_batch(tiles, size):
+    return table_batch(tiles, misplaced_tiles_table(size), size)
+
+def manhattan_batch(tiles, size):
+    return table_batch(tiles, manhattan_distance_table(size), size)
+
+#Goal positions along the line of the tiles in one row or column that belong to that line
+def goal_slots(line, kind, number, size):
+    slots = []
+    for tile in line.tolist():
+        goal_row, goal_col = divmod(tile - 1, size)
+        if tile and (goal_row if kind == 'row' else goal_col) == number:
+            slots.append(goal_col if kind == 'row' else goal_row)
+    return slots
+
+#Manhattan distance plus linear conflicts, equal to nine.linear_conflict_heuristic. Conflicts are
+#only worked out once per distinct line content in the batch and scattered back by index.
+def linear_conflict_batch(tiles, size):
+    cells = size * size
+    boards = tiles.reshape(-1, size, size)
+    weights = cells ** np.arange(size - 1, -1, -1, dtype=np.int64)
+    h = manhattan_batch(tiles, size).astype(np.int64)
+    for kind, lines in (('row', boards), ('col', boards.transpose(0, 2, 1))):
+        for number in range(size):
+            line = lines[:, number, :]
+            keys = line @ weights
+            _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+            conflicts = np.array([line_conflicts(goal_slots(line[index], kind, number, size)) for index in first],
+                                 dtype=np.int64)
+            h += conflicts[inverse.reshape(-1)]
+    return h
+
+HEURISTICS = {
+    'misplaced': misplaced_batch,
+    'manhattan': manhattan_batch,
+    'linear_conflict': linear_conflict_batch,
+}
+
+#Heuristic values of many packed states of one board size in one call
+def evaluate_batch(states, size, name='manhattan'):
+    if name not in HEURISTICS:
+        raise ValueError(f"Unknown heuristic '{name}'. Choose from: {', '.join(HEURISTICS)}")
+    if not len(states):
+        return np.zeros(0, dtype=np.int64)
+    return HEURISTICS[name](stack_states(states, size), size)
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a file of boards with every heuristic at once, using NumPy.")
+    parser.add_argument('input', nargs='?', default='-', help="file with one board per line, - for stdin")
+    parser.add_argument('--heuristics', default=','.join(HEURISTICS), help="comma separated: " + ", ".join(HEURISTICS))
+    args = parser.parse_args()
+    require_numpy()
+    names = args.heuristics.split(',')
+    source = sys.stdin if args.input == '-' else open(args.input)
+    by_size = {}
+    records = []
+    for index, line in enumerate(read_boards(source)):
+        record = {'index': index, 'board': line}
+        try:
+            state, size = parse_board(line)
+        except ValueError as error:
+            record['error'] = str(error)
+        else:
+            by_size.setdefault(size, []).append((state, record))
+        records.append(record)
+    for size, items in by_size.items():
+        states = [state for state, _ in items]
+        for name in names:
+            for (_, record), value in zip(items, evaluate_batch(states, size, name).tolist()):
+                record[name] = value
+    for record in records:
+        print(json.dumps(record))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+import sys
+from math import factorial
+
+#Boards with at most this many solvable states can get a bitset, bigger ones a set of packed ints.
+#3x3 has 181,440 (about 23 KB of bits), 4x4 already has over 10**13.
+RANKED_LIMIT = 1 << 24
+
+#Set of the ints 0..count-1 as one bit each, for spaces whose states already are dense indexes,
+#like the (placement, blank) codes of a pattern database group
+class Bitset:
+    def __init__(self, count):
+        self.bits = bytearray((count + 7) // 8)
+        self.count = 0
+
+    def __contains__(self, index):
+        return bool(self.bits[index >> 3] & (1 << (index & 7)))
+
+    def add(self, index):
+        if not self.bits[index >> 3] & (1 << (index & 7)):
+            self.bits[index >> 3] |= 1 << (index & 7)
+            self.count += 1
+
+    def discard(self, index):
+        if self.bits[index >> 3] & (1 << (index & 7)):
+            self.bits[index >> 3] &= ~(1 << (index & 7)) & 0xff
+            self.count -= 1
+
+    def clear(self):
+        self.bits[:] = bytes(len(self.bits))
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + self.bits.__sizeof__()
+
+#Visited set over the solvable boards of one size: one bit per board, indexed by the same rank as
+#distance_table.rank_state. Ranking reuses one scratch list, so add, discard and membership tests
+#allocate nothing but small ints. Works with packed states like set() does.
+class RankedBitset(Bitset):
+    def __init__(self, size, bits):
+        cells = size * size
+        super().__init__(factorial(cells) // 2)
+        self.mask = (1 << bits) - 1
+        self.shifts = tuple(index * bits for index in range(cells))
+        self.below = tuple((1 << position) - 1 for position in range(cells))
+        self.radix = tuple(cells - tile for tile in range(cells - 2))
+        self.where = [0] * cells
+
+    def rank(self, state):
+        where = self.where
+        mask = self.mask
+        for index, shift in enumerate(self.shifts):
+            where[(state >> shift) & mask] = index
+        below = self.below
+        used = 0
+        rank = 0
+        for tile, radix in enumerate(self.radix):
+            position = where[tile]
+            rank = rank * radix + position - (used & below[position]).bit_count()
+            used |= 1 << position
+        return rank
+
+    def __contains__(self, state):
+        return Bitset.__contains__(self, self.rank(state))
+
+    def add(self, state):
+        Bitset.add(self, self.rank(state))
+
+    def discard(self, state):
+        Bitset.discard(self, self.rank(state))
+
+#Visited set of a search: set() by default. kind 'bitset' trades time for memory: ranking a board
+#in Python makes each test a few times slower than hashing, but the whole 3x3 space fits in
+#23 KB. Boards too big to rank always get a set.
+VISITED_KINDS = ('set', 'bitset')
+
+def make_visited(size, bits, kind='set'):
+    if kind == 'bitset' and factorial(size * size) // 2 <= RANKED_LIMIT:
+        return RankedBitset(size, bits)
+    return set()
+
+#Memory a visited set holds, with the int objects a set keeps alive for its members
+def visited_bytes(visited):
+    if isinstance(visited, Bitset):
+        return sys.getsizeof(visited)
+    return sys.getsizeof(visited) + len(visited) * sys.getsizeof(next(iter(visited), 0))